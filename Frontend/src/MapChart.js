@@ -1,100 +1,59 @@
-import React, { useState } from "react";
+import React, { useEffect, useState } from "react";
 import DatamapsIndia from "react-datamaps-india";
 import axios from "axios";
-import "./MapChart.css"; 
+import "./MapChart.css";
+
+const API_URL = "http://127.0.0.1:8000";
 
 const MapChart = () => {
-  const [hoveredState, setHoveredState] = useState("");
-  const [topLanguages, setTopLanguages] = useState([]);
-  const [loading, setLoading] = useState(false);
+  // Every state's figures, fetched once; /map redirects to a versioned URL the browser caches
+  const [mapData, setMapData] = useState(null);
+  const [error, setError] = useState(null);
+
+  useEffect(() => {
+    axios
+      .get(`${API_URL}/map`)
+      .then((response) => setMapData(response.data))
+      .catch((err) => {
+        console.error("Error fetching map data:", err);
+        setError("Could not load census data");
+      });
+  }, []);
 
-  const handleHover = async (stateName) => {
-    if (stateName !== hoveredState) {
-      setHoveredState(stateName);
-      setLoading(true);
-      try {
-        const response = await axios.post(
-          "http://127.0.0.1:8000/most_spoken_languages/",
-          {
-            state_name: stateName,
-            num_languages: 3,
-          },
-          {
-            headers: {
-              "Content-Type": "application/json",
-            },
-          }
-        );
-        setTopLanguages(response.data.top_languages);
-      } catch (error) {
-        console.error("Error fetching languages:", error);
-      }
-      setLoading(false);
-    }
-  };
+  const states = mapData ? mapData.states : {};
+  const regionData = Object.fromEntries(
+    Object.entries(states).map(([name, state]) => [name, { value: state.population }])
+  );
 
   return (
     <div className="map-chart-container">
+      {error && <div className="loading-indicator">{error}</div>}
       <DatamapsIndia
         style={{ position: "relative", left: "25%" }}
-        regionData={{
-          "Andaman & Nicobar Island": { value: 150 },
-          "Andhra Pradesh": { value: 470 },
-          "Arunanchal Pradesh": { value: 248 },
-          Assam: { value: 528 },
-          Bihar: { value: 755 },
-          Chandigarh: { value: 95 },
-          Chhattisgarh: { value: 1700 },
-          Delhi: { value: 1823 },
-          Goa: { value: 508 },
-          Gujarat: { value: 624 },
-          Haryana: { value: 1244 },
-          "Himachal Pradesh": { value: 640 },
-          "Jammu & Kashmir": { value: 566 },
-          Jharkhand: { value: 814 },
-          Karnataka: { value: 2482 },
-          Kerala: { value: 899 },
-          Lakshadweep: { value: 15 },
-          "Madhya Pradesh": { value: 1176 },
-          Maharashtra: { value: 727 },
-          Manipur: { value: 314 },
-          Meghalaya: { value: 273 },
-          Mizoram: { value: 306 },
-          Nagaland: { value: 374 },
-          Odisha: { value: 395 },
-          Puducherry: { value: 245 },
-          Punjab: { value: 786 },
-          Rajasthan: { value: 1819 },
-          Sikkim: { value: 152 },
-          "Tamil Nadu": { value: 2296 },
-          Telangana: { value: 467 },
-          Tripura: { value: 194 },
-          "Uttar Pradesh": { value: 2944 },
-          Uttarakhand: { value: 1439 },
-          "West Bengal": { value: 1321 }
-        }}
+        regionData={regionData}
         hoverComponent={({ value }) => {
-          handleHover(value.name);
+          const state = states[value.name];
           return (
             <div className="hover-info">
               <div className="state-info">
-                {value.name} {value.value}
+                {value.name} {state ? state.population.toLocaleString() : ""}
               </div>
-              {loading && hoveredState === value.name ? (
+              {!mapData ? (
                 <div className="loading-indicator">Loading...</div>
+              ) : !state ? (
+                <div className="languages-info">No census data</div>
               ) : (
-                hoveredState === value.name && topLanguages.length > 0 && (
-                  <div className="languages-info">
-                    <h3>Top 3 Most Spoken Languages in {hoveredState}</h3>
-                    <ul>
-                      {topLanguages.map((language, index) => (
-                        <li key={index}>
-                          {language["Mother tongue name"]}: {language["Urban P"]}
-                        </li>
-                      ))}
-                    </ul>
-                  </div>
-                )
+                <div className="languages-info">
+                  <h3>Top 3 Most Spoken Languages in {value.name}</h3>
+                  <ul>
+                    {state.top_languages.map((language) => (
+                      <li key={language.language}>
+                        {language.language}: {language.speakers.toLocaleString()} ({language.share}%)
+                      </li>
+                    ))}
+                  </ul>
+                  <div>Language diversity index: {state.diversity.toFixed(2)}</div>
+                </div>
               )}
             </div>
           );
@@ -103,7 +62,7 @@ const MapChart = () => {
           title: "State Wise Distribution of the Top 3 languages Spoken",
           startColor: "#b3d1ff",
           endColor: "#005ce6",
-          hoverTitle: "Count",
+          hoverTitle: "Population",
           noDataColor: "#f5f5f5",
           borderColor: "#8D8D8D",
           hoverColor: "#0080ff",
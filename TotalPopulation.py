@@ -1,42 +1,16 @@
 import os
-import pandas as pd
 
-folder_path = 'data'
+from census_cache import FrameCache
+from census_store import DATA_DIR, CensusStore
 
-results = {}
+folder_path = DATA_DIR
 
-for file_name in os.listdir(folder_path):
-    if file_name.endswith('.XLSX') or file_name.endswith('.xls'):
+# The store's rollup cube already holds every state's totals at mother tongue
+# group level (codes ending in 000), summed from the state rows only
+store = CensusStore.load(cache=FrameCache())
+totals_df = store.rollups.state_totals()
 
-        file_path = os.path.join(folder_path, file_name)
-
-
-        df = pd.read_excel(file_path)
-
-
-        df.columns = [
-            "Table name", "State code", "District code", "Town code", "Area name",
-            "Mother tongue code", "Mother tongue name", "Unnamed: 7", "Unnamed: 8",
-            "Unnamed: 9", "Rural P", "Unnamed: 11", "Unnamed: 12",
-            "Urban P", "Unnamed: 14", "Unnamed: 15"
-        ]
-        df.columns = df.columns.str.strip()
-
-
-        df['Mother tongue code'] = df['Mother tongue code'].astype(str)
-
-        filtered_df = df[df['Mother tongue code'].str[-3:] == '000']
-
-        total_sum_rural = filtered_df['Rural P'].sum()
-        total_sum_urban = filtered_df['Urban P'].sum()
-
-        state_name = file_name.replace('.XLSX', '').replace('.xls', '')
-        results[state_name] = {
-            'Total Rural P Sum': total_sum_rural,
-            'Total Urban P Sum': total_sum_urban
-        }
-
-results_df = pd.DataFrame.from_dict(results, orient='index').reset_index()
+results_df = totals_df[['State', 'Rural P', 'Urban P']]
 results_df.columns = ['State Name', 'Total Rural P Sum', 'Total Urban P Sum']
 
 # Save the results DataFrame to a new Excel file
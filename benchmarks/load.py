@@ -0,0 +1,151 @@
+"""Map hover latency on its own, beside a town report, and beside a report run on the event loop.
+
+Run from the repository root:
+
+    python -m benchmarks.load [--clients 4] [--baseline-seconds 5] [--max-p99-ratio 5]
+
+Hovers are GET /district_languages/ requests spread over every district,
+metric and language count so each one is computed rather than served from
+the response cache. Three phases, each driven in-process through httpx's
+ASGI transport like benchmarks.suite:
+
+- idle:     hovers alone
+- dispatch: hovers while GET /generate_town_languages_report/ runs in the
+            report lane
+- blocking: hovers while the same report runs directly on the event loop,
+            as every endpoint used to
+
+Without a pincode directory a synthetic one (one post office per census
+town) is written into the scratch data/ so the town report runs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from itertools import cycle
+
+import httpx
+import pandas as pd
+
+from benchmarks.suite import latency_stats, make_workdir
+from census_schema import COUNT_COLUMNS, state_name
+from census_store import PINCODE_PATH
+
+
+def hover_requests(store) -> list:
+    requests = []
+    for stem in store.mother_tongue:
+        state = state_name(stem)
+        for district in store.districts.districts(state) or []:
+            for num_languages in range(1, 11):
+                for metric in COUNT_COLUMNS:
+                    requests.append({
+                        "state_name": state, "district_name": district["district_name"],
+                        "num_languages": num_languages, "metric": metric,
+                    })
+    return requests
+
+
+def write_synthetic_pincodes(store):
+    towns = pd.concat([
+        pd.DataFrame({"Office Name": df.loc[df['Town code'] != 0, 'Area name'].astype(str).unique(),
+                      "StateName": state_name(stem)})
+        for stem, df in store.mother_tongue.items()
+    ], ignore_index=True)
+    towns["Pincode"] = range(100000, 100000 + len(towns))
+    towns[["Office Name", "Pincode", "StateName"]].to_csv(PINCODE_PATH, index=False)
+
+
+async def hover_until(client, bodies, done: asyncio.Event, clients: int) -> list:
+    latencies = []
+
+    async def hover():
+        while not done.is_set():
+            start = time.perf_counter()
+            response = await client.get("/district_languages/", params=next(bodies))
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                raise RuntimeError(f"hover -> {response.status_code}: {response.text[:200]}")
+
+    await asyncio.gather(*(hover() for _ in range(clients)))
+    return latencies
+
+
+async def run_phases(args) -> dict:
+    import main
+
+    async with main.app.router.lifespan_context(main.app):
+        store = main.app.state.store
+        bodies = cycle(hover_requests(store))
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            results = {}
+
+            done = asyncio.Event()
+            asyncio.get_running_loop().call_later(args.baseline_seconds, done.set)
+            results["idle"] = {"hover": latency_stats(await hover_until(client, bodies, done, args.clients))}
+
+            async def report_over_http():
+                response = await client.get("/generate_town_languages_report/")
+                if response.status_code != 200:
+                    raise RuntimeError(f"town report -> {response.status_code}: {response.text[:200]}")
+
+            async def report_on_loop():
+                # What an async def endpoint calling the builder directly did
+                report_df, _ = main.reports.town_languages_report(store, 4, main.app.state.report_pool)
+                main.reports.write_xlsx(report_df, os.path.join("data", "Top_4_Languages_Indian_Towns_with_Pincode.xlsx"))
+
+            for phase, report in (("dispatch", report_over_http), ("blocking", report_on_loop)):
+                done = asyncio.Event()
+                hovers = asyncio.ensure_future(hover_until(client, bodies, done, args.clients))
+                # Let the hover clients get going before the report starts
+                await asyncio.sleep(0.2)
+                start = time.perf_counter()
+                await report()
+                report_seconds = time.perf_counter() - start
+                done.set()
+                results[phase] = {"hover": latency_stats(await hovers), "report_seconds": round(report_seconds, 3)}
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=4, help="Concurrent hover clients")
+    parser.add_argument("--baseline-seconds", type=float, default=5.0)
+    parser.add_argument("--max-p99-ratio", type=float, default=5.0,
+                        help="Fail if hover p99 beside the dispatched report exceeds this multiple of idle p99")
+    args = parser.parse_args(argv)
+
+    from census_cache import FrameCache
+    from census_store import CensusStore
+
+    workdir = tempfile.mkdtemp(prefix="census-load-")
+    cwd = os.getcwd()
+    try:
+        os.chdir(make_workdir(workdir))
+        if not os.path.exists(PINCODE_PATH):
+            write_synthetic_pincodes(CensusStore.load(cache=FrameCache()))
+        results = asyncio.run(run_phases(args))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    idle_p99 = results["idle"]["hover"]["p99_ms"]
+    results["p99_ratio"] = {
+        phase: round(results[phase]["hover"]["p99_ms"] / idle_p99, 1) for phase in ("dispatch", "blocking")
+    }
+    print(json.dumps(results, indent=2))
+
+    if results["p99_ratio"]["dispatch"] > args.max_p99_ratio:
+        print(f"FAILED: hover p99 beside the report is {results['p99_ratio']['dispatch']}x idle", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Resident memory of the census tables: default pandas frames vs the compact store.
+
+Run from the repository root:
+
+    python -m benchmarks.memory
+
+Each mode loads the data in a fresh interpreter and reports how much its
+anonymous resident memory (heap data, excluding the shared libraries pulled
+in on first use) grew over the imports alone, plus the deep size of the C-16
+frames:
+
+- legacy:  pd.read_excel with default dtypes for every data/ and data1/ workbook
+- compact: CensusStore.load (Parquet cache, int16/int32 codes and counts,
+           shared categories, no Table name), including its rankings and indexes
+"""
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+
+MODES = ("legacy", "compact")
+
+
+def resident_bytes(field: str = "RssAnon") -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError(f"{field} not reported by /proc/self/status")
+
+
+def measure(mode: str) -> dict:
+    import pandas as pd
+    from census_cache import FrameCache
+    from census_store import BILINGUAL_DATA_DIR, DATA_DIR, CensusStore, frame_memory, list_workbooks
+
+    gc.collect()
+    baseline = resident_bytes()
+
+    if mode == "legacy":
+        c16 = [pd.read_excel(os.path.join(DATA_DIR, name), skiprows=3) for name in list_workbooks(DATA_DIR)]
+        c17 = [pd.read_excel(os.path.join(BILINGUAL_DATA_DIR, name), skiprows=5) for name in list_workbooks(BILINGUAL_DATA_DIR)]
+        c16_bytes = int(sum(df.memory_usage(deep=True).sum() for df in c16))
+        rows = sum(len(df) for df in c16)
+    else:
+        store = CensusStore.load(cache=FrameCache())
+        c16_bytes = frame_memory(store.mother_tongue.values())
+        rows = sum(len(df) for df in store.mother_tongue.values())
+
+    gc.collect()
+    return {
+        "mode": mode,
+        "c16_rows": rows,
+        "c16_frame_mb": round(c16_bytes / 2**20, 1),
+        "anon_rss_growth_mb": round((resident_bytes() - baseline) / 2**20, 1),
+        "rss_mb": round(resident_bytes("VmRSS") / 2**20, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=MODES, help="Measure one mode in this process (used internally)")
+    args = parser.parse_args(argv)
+
+    if args.mode:
+        print(json.dumps(measure(args.mode)))
+        return 0
+
+    results = {}
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.memory", "--mode", mode],
+            check=True, capture_output=True, text=True
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    legacy, compact = results["legacy"], results["compact"]
+    results["c16_frame_reduction"] = round(1 - compact["c16_frame_mb"] / legacy["c16_frame_mb"], 3)
+    results["anon_rss_growth_reduction"] = round(1 - compact["anon_rss_growth_mb"] / legacy["anon_rss_growth_mb"], 3)
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+"""Latency, throughput and peak RSS of every endpoint, report builder and TotalPopulation.py.
+
+Run from the repository root:
+
+    python -m benchmarks.suite [--requests 200] [--concurrency 16] [--repeat 3] [--output bench.json]
+
+Endpoints are driven in-process through httpx's ASGI transport with the app's
+lifespan running, so no server or network is involved. Everything runs in a
+scratch directory whose data/ and data1/ link to the bundled workbooks, so the
+report endpoints write their output there instead of over tracked files.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from itertools import cycle
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from census_cache import CACHE_DIR
+from census_schema import state_name
+from census_store import BILINGUAL_DATA_DIR, DATA_DIR, DISTRICT_CODES_PATH, REPORT_FILES
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ru_maxrss is KiB on Linux and bytes on macOS
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF) -> float:
+    return round(resource.getrusage(who).ru_maxrss * RSS_UNIT / 2**20, 1)
+
+
+def latency_stats(seconds: list) -> dict:
+    ms = np.asarray(seconds) * 1000
+    return {
+        "n": len(ms),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p90_ms": round(float(np.percentile(ms, 90)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+def make_workdir(path: str) -> str:
+    # Link every source workbook and the Parquet cache; leave report outputs behind
+    for folder in (DATA_DIR, BILINGUAL_DATA_DIR):
+        os.makedirs(os.path.join(path, folder), exist_ok=True)
+        for name in os.listdir(os.path.join(REPO_DIR, folder)):
+            if name not in REPORT_FILES:
+                os.symlink(os.path.join(REPO_DIR, folder, name), os.path.join(path, folder, name))
+
+    os.symlink(os.path.join(REPO_DIR, DISTRICT_CODES_PATH), os.path.join(path, DISTRICT_CODES_PATH))
+    os.makedirs(os.path.join(REPO_DIR, CACHE_DIR), exist_ok=True)
+    os.symlink(os.path.join(REPO_DIR, CACHE_DIR), os.path.join(path, CACHE_DIR))
+    return path
+
+
+def query_cases(store) -> dict:
+    # Request bodies cycled per endpoint so lookups spread over every state and district
+    states = [state_name(stem) for stem in store.mother_tongue]
+    district_pairs = [
+        (state, district["district_name"])
+        for state in states
+        for district in (store.districts.districts(state) or [])
+    ]
+    bilingual_states = [state_name(stem) for stem in store.bilingual if stem.lower() != "india"]
+
+    return {
+        "POST /most_spoken_languages/": [
+            ("POST", "/most_spoken_languages/", {"json": {"state_name": s, "num_languages": 3}}) for s in states
+        ],
+        "GET /most_spoken_languages/": [
+            ("GET", "/most_spoken_languages/", {"params": {"state_name": s, "num_languages": 3}}) for s in states
+        ],
+        "POST /district_languages/": [
+            ("POST", "/district_languages/", {"json": {"state_name": s, "district_name": d, "num_languages": 3}})
+            for s, d in district_pairs
+        ],
+        "POST /batch_languages/": [
+            ("POST", "/batch_languages/", {"json": {"queries": [{"state_name": s, "num_languages": 3} for s in states]}})
+        ],
+        "POST /top_languages/": [
+            ("POST", "/top_languages/", {"json": {"state_name": s, "num_languages": 3}}) for s in bilingual_states
+        ],
+        "POST /query": [
+            ("POST", "/query", {"json": {"states": [s], "group_by": ["district", "language"], "shares": True, "top": 3}})
+            for s in states
+        ] + [
+            ("POST", "/query", {"json": {"group_by": ["state"], "area": "Urban", "metrics": ["P", "M", "F"]}}),
+        ],
+    }
+
+
+REPORT_ENDPOINTS = [
+    ("GET", "/all_top_languages/", {"params": {"num_languages": 4}}),
+    ("GET", "/generate_top_languages_report/", {}),
+    ("GET", "/generate_top_languages_report1/", {}),
+    ("GET", "/generate_town_languages_report/", {}),
+]
+
+
+async def send(client, request) -> float:
+    method, url, kwargs = request
+    start = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    elapsed = time.perf_counter() - start
+    if response.status_code >= 400:
+        raise RuntimeError(f"{method} {url} -> {response.status_code}: {response.text[:200]}")
+    return elapsed
+
+
+async def bench_query(client, name, requests, n, concurrency) -> dict:
+    bodies = cycle(requests)
+    latencies = [await send(client, next(bodies)) for _ in range(n)]
+
+    # Throughput: n requests with at most `concurrency` in flight
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(request):
+        async with semaphore:
+            return await send(client, request)
+
+    start = time.perf_counter()
+    concurrent_latencies = await asyncio.gather(*(limited(next(bodies)) for _ in range(n)))
+    wall = time.perf_counter() - start
+
+    return {
+        "case": name,
+        "kind": "endpoint",
+        "latency": latency_stats(latencies),
+        "concurrent_latency": latency_stats(concurrent_latencies),
+        "concurrency": concurrency,
+        "throughput_rps": round(n / wall, 1),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+async def bench_endpoints(args) -> tuple:
+    import main
+
+    results = []
+    async with main.app.router.lifespan_context(main.app):
+        store = main.app.state.store
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for name, requests in query_cases(store).items():
+                results.append(await bench_query(client, name, requests, args.requests, args.concurrency))
+
+            for request in REPORT_ENDPOINTS:
+                if request[1] == "/generate_town_languages_report/" and store.pincodes is None:
+                    results.append({"case": f"{request[0]} {request[1]}", "kind": "report_endpoint", "skipped": "no pincode file"})
+                    continue
+                latencies = [await send(client, request) for _ in range(args.repeat)]
+                results.append({
+                    "case": f"{request[0]} {request[1]}",
+                    "kind": "report_endpoint",
+                    "latency": latency_stats(latencies),
+                    "peak_rss_mb": peak_rss_mb(),
+                })
+
+        results.extend(bench_report_builders(store, main.app.state.report_pool, args.repeat))
+        dataset_version = store.version
+
+    return dataset_version, results
+
+
+def bench_report_builders(store, executor, repeat) -> list:
+    import reports
+
+    results = []
+    for name, (builder, _, _) in reports.REPORTS.items():
+        if name == "town_languages" and store.pincodes is None:
+            results.append({"case": f"reports.{builder.__name__}", "kind": "report_builder", "skipped": "no pincode file"})
+            continue
+        latencies = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            builder(store, 4, executor)
+            latencies.append(time.perf_counter() - start)
+        results.append({
+            "case": f"reports.{builder.__name__}",
+            "kind": "report_builder",
+            "latency": latency_stats(latencies),
+            "peak_rss_mb": peak_rss_mb(),
+        })
+    return results
+
+
+def bench_total_population(repeat) -> dict:
+    # A standalone script: run it as its own process and read that process's rusage
+    latencies = []
+    peak = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(REPO_DIR, "TotalPopulation.py")],
+            stdout=subprocess.DEVNULL,
+        )
+        _, status, usage = os.wait4(process.pid, 0)
+        latencies.append(time.perf_counter() - start)
+        if status != 0:
+            raise RuntimeError(f"TotalPopulation.py exited with status {status}")
+        peak = max(peak, usage.ru_maxrss * RSS_UNIT / 2**20)
+
+    return {
+        "case": "TotalPopulation.py",
+        "kind": "script",
+        "latency": latency_stats(latencies),
+        "peak_rss_mb": round(peak, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per query endpoint and per throughput run")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of each report endpoint and builder")
+    parser.add_argument("--script-repeat", type=int, default=1, help="Runs of TotalPopulation.py")
+    parser.add_argument("--skip-script", action="store_true", help="Leave out TotalPopulation.py")
+    parser.add_argument("--output", help="Write the JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    output = os.path.abspath(args.output) if args.output else None
+    workdir = tempfile.mkdtemp(prefix="census-bench-")
+    cwd = os.getcwd()
+    try:
+        os.chdir(make_workdir(workdir))
+        dataset_version, cases = asyncio.run(bench_endpoints(args))
+        if not args.skip_script:
+            cases.append(bench_total_population(args.script_repeat))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "dataset_version": dataset_version,
+            "args": vars(args),
+        },
+        "cases": cases,
+        "peak_rss_mb": {
+            "self": peak_rss_mb(),
+            "children": peak_rss_mb(resource.RUSAGE_CHILDREN),
+        },
+    }
+
+    text = json.dumps(results, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Town report: nested groupby/iterrows builder vs the vectorised engine.
+
+Run from the repository root:
+
+    python -m benchmarks.town_report [--states Maharashtra Uttar_Pradesh] [--repeat 3] [--min-speedup 10]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import pandas as pd
+
+from census_cache import FrameCache
+from census_store import DATA_DIR, PINCODE_PATH, load_c16, load_pincodes
+from pincodes import PincodeIndex
+from reports import keep_second_occurrence, state_name, town_languages_rows
+
+
+def clean_town_name(name):
+    if isinstance(name, str):
+        return name.split(' (')[0].strip().lower()
+    return name
+
+
+def legacy_town_languages_rows(stem, df, pincode_map, num_languages):
+    # The per-town loop generate_town_languages_report used before the vectorised engine
+    rows = []
+
+    df_filtered = keep_second_occurrence(df[df['District code'] != 0], ['Mother tongue name', 'District code', 'Town code'])
+
+    for district_code, district_df in df_filtered.groupby('District code'):
+        district_towns = district_df[district_df['Town code'] == 0]
+        district_name = district_towns['Area name'].values[0] if not district_towns.empty else None
+
+        for (town_code, town_name), town_df in district_df.groupby(['Town code', 'Area name'], observed=True):
+            town_grouped = town_df.groupby('Mother tongue name', observed=True).agg({
+                'Total P': 'sum',
+                'Total M': 'sum',
+                'Total F': 'sum'
+            }).reset_index()
+
+            # The original used the default quicksort, whose order for equal counts is
+            # arbitrary in towns with more than 16 languages; stable makes it comparable
+            top_languages = town_grouped.sort_values(by='Total P', ascending=False, kind='stable').head(num_languages)
+
+            pincodes = pincode_map.get(clean_town_name(town_name), [])
+
+            for _, row in top_languages.iterrows():
+                rows.append({
+                    "State": state_name(stem),
+                    "District Name": district_name,
+                    "Town": town_name,
+                    "Language": row['Mother tongue name'],
+                    "Total Population": row['Total P'],
+                    "Male Population": row['Total M'],
+                    "Female Population": row['Total F'],
+                    "Pincode": pincodes
+                })
+    return pd.DataFrame(rows)
+
+
+def best_of(repeat, fn, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--states", nargs="+", default=["Maharashtra", "Uttar_Pradesh"])
+    parser.add_argument("--num-languages", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-speedup", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    cache = FrameCache()
+    frames = {stem: cache.load(os.path.join(DATA_DIR, stem + ".XLSX"), load_c16) for stem in args.states}
+    cache.save_manifest()
+
+    if os.path.exists(PINCODE_PATH):
+        pincode_index = PincodeIndex.build(cache.load(PINCODE_PATH, load_pincodes), frames)
+        pincode_maps = pincode_index.state_towns
+    else:
+        # No pincode directory in the checkout: give every town a synthetic pincode so the join is still exercised
+        pincode_maps = {
+            stem: {clean_town_name(str(town)): [100000 + i] for i, town in enumerate(df['Area name'].cat.categories)}
+            for stem, df in frames.items()
+        }
+
+    results = []
+    for stem, df in frames.items():
+        pincode_map = pincode_maps[stem]
+        legacy_seconds, legacy_df = best_of(args.repeat, legacy_town_languages_rows, stem, df, pincode_map, args.num_languages)
+        seconds, report_df = best_of(args.repeat, town_languages_rows, stem, df, pincode_map, args.num_languages)
+
+        results.append({
+            "state": stem,
+            "rows": len(report_df),
+            "legacy_seconds": round(legacy_seconds, 4),
+            "vectorised_seconds": round(seconds, 4),
+            "speedup": round(legacy_seconds / seconds, 1),
+            "identical": legacy_df.equals(report_df),
+        })
+
+    print(json.dumps(results, indent=2))
+
+    failed = [r["state"] for r in results if not r["identical"] or r["speedup"] < args.min_speedup]
+    if failed:
+        print(f"FAILED: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+from census_schema import state_name
+from rankings import Ranking
+
+# The national C-17 workbook in data1/; it is indexed like a state but kept
+# out of cross-state rankings
+NATIONAL_STEM = "India"
+
+PERSON_COLUMNS = ["Persons", "Males", "Females"]
+SUBSIDIARY_LEVELS = ["First subsidiary", "Second subsidiary", "Any subsidiary"]
+
+
+def _language(series: pd.Series) -> pd.Series:
+    # Names arrive upper-case and often with trailing spaces ("HINDI ")
+    return series.astype("string").str.strip().str.lower()
+
+
+def _level(df: pd.DataFrame, rows: np.ndarray, parents: dict, language: pd.Series, counts: list) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Sheet": df["Sheet"].to_numpy()[rows],
+        **{name: parent.to_numpy()[rows] for name, parent in parents.items()},
+        "Language": language.to_numpy()[rows],
+        **{name: df[col].fillna(0).astype("int64").to_numpy()[rows] for name, col in zip(PERSON_COLUMNS, counts)},
+    })
+
+
+def parse_c17(df: pd.DataFrame):
+    """Split C-17 rows into mother tongue, bilingual and trilingual tables.
+
+    A sheet walks down the hierarchy: a mother tongue row, then each first
+    subsidiary language of its speakers, each followed by the second subsidiary
+    languages of that pair. Each row only fills its own level's columns, so
+    parents are forward-filled within their block. ``df`` may hold several
+    sheets stacked with a ``Sheet`` column.
+    """
+    mother_rows = (df['Mother tongue name'].notna() & df['Persons'].notna()).to_numpy()
+    first_rows = (df['First subsidiary language'].notna() & df['First subsidiary persons'].notna()).to_numpy()
+    second_rows = (df['Second subsidiary language'].notna() & df['Second subsidiary persons'].notna()).to_numpy()
+
+    # A block is one mother tongue of one sheet; a new sheet always starts one
+    sheet_start = np.r_[True, df["Sheet"].to_numpy()[1:] != df["Sheet"].to_numpy()[:-1]]
+    block = pd.Series(np.cumsum(mother_rows | sheet_start), index=df.index)
+
+    mother = _language(df['Mother tongue name']).where(mother_rows).groupby(block).ffill()
+    first = _language(df['First subsidiary language']).where(first_rows).groupby(block).ffill()
+    second = _language(df['Second subsidiary language'])
+
+    speakers = _level(df, mother_rows, {}, mother, ['Persons', 'Males', 'Females'])
+    bilingual = _level(df, first_rows, {"Mother tongue": mother}, first,
+                       ['First subsidiary persons', 'First subsidiary males', 'First subsidiary females'])
+    trilingual = _level(df, second_rows, {"Mother tongue": mother, "First subsidiary": first}, second,
+                        ['Second subsidiary persons', 'Second subsidiary males', 'Second subsidiary females'])
+    return speakers, bilingual, trilingual
+
+
+class BilingualIndex:
+    """Every C-17 sheet parsed once into mother tongue -> first -> second subsidiary rankings.
+
+    Rankings are keyed by workbook stem ("Sheet") first, so the national
+    India.XLSX is queried like any state; ``subsidiary_states`` ranks the
+    states (India excluded) by speakers of each subsidiary language.
+    """
+
+    def __init__(self, mother_tongues: Ranking, first_subsidiary: Ranking, second_subsidiary: Ranking,
+                 first_largest: Ranking, second_largest: Ranking, subsidiary_states: Ranking,
+                 national_subsidiary: dict):
+        self.mother_tongues = mother_tongues
+        # Keyed by (sheet, mother tongue) and (sheet, mother tongue, first subsidiary)
+        self.first_subsidiary = first_subsidiary
+        self.second_subsidiary = second_subsidiary
+        # Each subsidiary language ranked by its largest single mother tongue
+        # group, as the per-state top_languages summary has always reported
+        self.first_largest = first_largest
+        self.second_largest = second_largest
+        self.subsidiary_states = subsidiary_states
+        # language -> speakers at each SUBSIDIARY_LEVELS on the national sheet
+        self.national_subsidiary = national_subsidiary
+
+    @classmethod
+    def build(cls, bilingual: dict) -> "BilingualIndex":
+        # One stacked frame keeps the groupbys and rankings to a handful of
+        # vectorised passes instead of several per sheet
+        stacked = pd.concat([df.assign(Sheet=stem) for stem, df in bilingual.items()], ignore_index=True)
+        speakers, pairs, triples = parse_c17(stacked)
+
+        def ranking(df, keys, how):
+            agg = getattr(df.dropna(subset=keys).groupby(keys + ["Language"])[PERSON_COLUMNS], how)().reset_index()
+            return Ranking.build(agg, keys, "Language", PERSON_COLUMNS)
+
+        subsidiary_totals = pd.concat([
+            pairs.groupby(["Language", "Sheet"])["Persons"].sum().rename(SUBSIDIARY_LEVELS[0]),
+            triples.groupby(["Language", "Sheet"])["Persons"].sum().rename(SUBSIDIARY_LEVELS[1]),
+        ], axis=1).fillna(0).astype("int64").reset_index()
+        subsidiary_totals[SUBSIDIARY_LEVELS[2]] = subsidiary_totals[SUBSIDIARY_LEVELS[:2]].sum(axis=1)
+        is_national = (subsidiary_totals["Sheet"].str.lower() == NATIONAL_STEM.lower()).to_numpy()
+        national = {
+            language: dict(zip(SUBSIDIARY_LEVELS, map(int, counts)))
+            for language, counts in zip(subsidiary_totals["Language"][is_national],
+                                        subsidiary_totals[SUBSIDIARY_LEVELS][is_national].to_numpy())
+        }
+        subsidiary_totals = subsidiary_totals[~is_national]
+        subsidiary_totals["State"] = subsidiary_totals["Sheet"].map(state_name)
+        subsidiary_totals = subsidiary_totals.sort_values(["Language", "State"], kind="stable")
+
+        return cls(
+            ranking(speakers, ["Sheet"], "max"),
+            ranking(pairs, ["Sheet", "Mother tongue"], "sum"),
+            ranking(triples, ["Sheet", "Mother tongue", "First subsidiary"], "sum"),
+            ranking(pairs, ["Sheet"], "max"),
+            ranking(triples, ["Sheet"], "max"),
+            Ranking.build(subsidiary_totals, ["Language"], "State", SUBSIDIARY_LEVELS),
+            national,
+        )
+
+    def languages(self, stem: str, mother_tongue=None, first_subsidiary=None, metric: str = "Persons",
+                  num_languages: int = 10):
+        # Walk down the hierarchy as far as the arguments go
+        if mother_tongue is None:
+            return self.mother_tongues.top(stem, metric, num_languages)
+        if first_subsidiary is None:
+            return self.first_subsidiary.top((stem, mother_tongue), metric, num_languages)
+        return self.second_subsidiary.top((stem, mother_tongue, first_subsidiary), metric, num_languages)
+
+    def national(self, language: str):
+        return self.national_subsidiary.get(language)
+
+    def states_speaking(self, language: str, level: str = "Any subsidiary", num_states: int = 10):
+        return self.subsidiary_states.top(language, level, num_states)
@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import time
+import pandas as pd
+import pyarrow as pa
+
+from census_store import (
+    BILINGUAL_DATA_DIR, DATA_DIR, DISTRICT_CODES_PATH, PINCODE_PATH, CensusStore, file_digest
+)
+from metrics import stage
+
+CACHE_DIR = ".census_cache"
+MANIFEST_FILE = "manifest.json"
+
+# Bump whenever a census_store loader changes the shape or dtypes it returns
+CACHE_VERSION = 2
+
+# Arrow's default mimalloc pool keeps the pages freed after each Parquet read,
+# leaving roughly twice the loaded frames resident; the system allocator hands
+# them back. ARROW_DEFAULT_MEMORY_POOL still wins when set explicitly.
+if "ARROW_DEFAULT_MEMORY_POOL" not in os.environ:
+    pa.set_memory_pool(pa.system_memory_pool())
+
+
+class FrameCache:
+    """Parquet copies of parsed census sources, invalidated by source mtime/size and hash."""
+
+    def __init__(self, cache_dir: str = CACHE_DIR, force: bool = False):
+        self.cache_dir = cache_dir
+        self.force = force
+        self.rebuilt = []
+        self.reused = []
+        self.manifest = self._read_manifest()
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.cache_dir, MANIFEST_FILE)
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self._manifest_path()) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("version") != CACHE_VERSION:
+            return {}
+        return manifest.get("files", {})
+
+    def save_manifest(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self._manifest_path() + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": CACHE_VERSION, "files": self.manifest}, f, indent=2)
+        os.replace(tmp_path, self._manifest_path())
+
+    def _cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key.replace(os.sep, "__").replace(":", "") + ".parquet")
+
+    def _is_fresh(self, key: str, source_path: str, stat: os.stat_result) -> bool:
+        entry = self.manifest.get(key)
+        if self.force or entry is None or not os.path.exists(self._cache_path(key)):
+            return False
+        if entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return True
+        # A touched but unchanged file (e.g. after git checkout) keeps its cache entry
+        if entry["size"] == stat.st_size and entry["sha256"] == file_digest(source_path):
+            entry["mtime_ns"] = stat.st_mtime_ns
+            return True
+        return False
+
+    def _key(self, source_path: str) -> str:
+        key = os.path.normpath(os.path.relpath(source_path))
+        if key.startswith(".."):
+            key = os.path.abspath(source_path)
+        return key
+
+    def digest(self, source_path: str) -> str:
+        return self.manifest[self._key(source_path)]["sha256"]
+
+    def load(self, source_path: str, loader) -> pd.DataFrame:
+        key = self._key(source_path)
+        stat = os.stat(source_path)
+        cache_path = self._cache_path(key)
+
+        if self._is_fresh(key, source_path, stat):
+            self.reused.append(key)
+            with stage("cache.read_parquet"):
+                return pd.read_parquet(cache_path, memory_map=True)
+
+        df = loader(source_path)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with stage("cache.write_parquet"):
+            df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+
+        self.manifest[key] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": file_digest(source_path),
+        }
+        self.rebuilt.append(key)
+        return df
+
+
+def build_cache(args):
+    start = time.perf_counter()
+    cache = FrameCache(args.cache_dir, force=args.force)
+    store = CensusStore.load(args.data_dir, args.bilingual_dir, args.district_codes, args.pincodes, cache=cache)
+    elapsed = time.perf_counter() - start
+
+    for key in cache.rebuilt:
+        print(f"rebuilt {key}")
+    print(
+        f"{len(store.mother_tongue)} C-16 and {len(store.bilingual)} C-17 workbooks cached in {args.cache_dir} "
+        f"({len(cache.rebuilt)} rebuilt, {len(cache.reused)} reused) in {elapsed:.2f}s"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the Parquet cache of the census source files")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build-cache", help="Parse stale census sources and write them to the cache")
+    build.add_argument("--cache-dir", default=CACHE_DIR)
+    build.add_argument("--data-dir", default=DATA_DIR)
+    build.add_argument("--bilingual-dir", default=BILINGUAL_DATA_DIR)
+    build.add_argument("--district-codes", default=DISTRICT_CODES_PATH)
+    build.add_argument("--pincodes", default=PINCODE_PATH)
+    build.add_argument("--force", action="store_true", help="Rebuild every file even if its cache entry is fresh")
+    build.set_defaults(func=build_cache)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import re
+import pandas as pd
+
+# C-16 "Population by mother tongue" layout shared by every workbook in data/
+C16_COLUMNS = [
+    "Table name", "State code", "District code", "Town code", "Area name",
+    "Mother tongue code", "Mother tongue name", "Total P", "Total M", "Total F",
+    "Rural P", "Rural M", "Rural F",
+    "Urban P", "Urban M", "Urban F"
+]
+CODE_COLUMNS = ["State code", "District code", "Town code", "Mother tongue code"]
+COUNT_COLUMNS = C16_COLUMNS[7:]
+
+# Compact in-memory dtypes: district codes stay below 1000, town codes below
+# 10^6, and no state-level count reaches 2^31
+CODE_DTYPES = {"State code": "int16", "District code": "int16", "Town code": "int32", "Mother tongue code": "int32"}
+COUNT_DTYPE = "int32"
+
+# Name columns whose categories are shared by every state's frame
+SHARED_CATEGORY_COLUMNS = ["Mother tongue name", "Area name"]
+
+# C-17 "Bilingualism and trilingualism" layout shared by every workbook in data1/
+C17_COLUMNS = [
+    "State code", "State name", "Mother tongue code", "Mother tongue name",
+    "Persons", "Males", "Females",
+    "First subsidiary code", "First subsidiary language",
+    "First subsidiary persons", "First subsidiary males", "First subsidiary females",
+    "Second subsidiary code", "Second subsidiary language",
+    "Second subsidiary persons", "Second subsidiary males", "Second subsidiary females"
+]
+C17_TEXT_COLUMNS = ["State name", "Mother tongue name", "First subsidiary language", "Second subsidiary language"]
+
+# Spellings used by the workbook names, District_Codes.xlsx and the map
+# component, mapped onto one canonical key per state
+STATE_ALIASES = {
+    "a and n islands": "andaman and nicobar islands",
+    "andaman and nicobar island": "andaman and nicobar islands",
+    "arunanchal pradesh": "arunachal pradesh",
+    "d and n haveli": "dadra and nagar haveli",
+    "delhi": "nct of delhi",
+    "harayan": "haryana",
+    "laakshwadeep": "lakshadweep",
+    "orissa": "odisha",
+    "telengana": "telangana",
+}
+
+
+def state_name(stem: str) -> str:
+    # Workbook stems spell states with underscores ("Tamil_Nadu")
+    return stem.replace("_", " ")
+
+
+def district_total_rows(df: pd.DataFrame) -> pd.DataFrame:
+    # One town code 0 row per district of a C-16 frame; its Area name is the district's name
+    districts = df[(df['District code'] != 0) & (df['Town code'] == 0)]
+    return districts.drop_duplicates(subset=['District code'])
+
+
+def name_key(name: str) -> str:
+    name = str(name).lower().replace("&", " and ")
+    return re.sub(r"[^a-z0-9]+", " ", name).strip()
+
+
+def state_key(state_name: str) -> str:
+    key = name_key(state_name)
+    return STATE_ALIASES.get(key, key)
+
+
+def normalise_language(names: pd.Series) -> pd.Series:
+    return names.str.strip().str.replace(r'^\d+\s*', '', regex=True).str.strip().str.lower()
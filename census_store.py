@@ -0,0 +1,327 @@
+import hashlib
+import os
+import time
+import numpy as np
+import pandas as pd
+
+from bilingual import BilingualIndex
+from census_schema import (
+    C16_COLUMNS, C17_COLUMNS, C17_TEXT_COLUMNS, CODE_COLUMNS, CODE_DTYPES, COUNT_COLUMNS, COUNT_DTYPE,
+    SHARED_CATEGORY_COLUMNS, normalise_language, state_key
+)
+from district_index import DistrictIndex
+from diversity import LanguageMix
+from map_payload import MapPayload
+from metrics import SOURCE_LOAD_SECONDS, stage
+from pincodes import PincodeIndex
+from rankings import LanguageRankings
+from rollups import RollupCube
+from search import SearchIndex
+
+DATA_DIR = "data"
+BILINGUAL_DATA_DIR = "data1"
+DISTRICT_CODES_PATH = "District_Codes.xlsx"
+PINCODE_PATH = os.path.join(DATA_DIR, "Updated_Pincode.csv")
+
+# Workbooks the report endpoints write back into the data folders
+REPORT_FILES = {
+    "Top_3_Languages_Indian_States.xlsx",
+    "Top_4_Languages_Indian_States.xlsx",
+    "Top_4_Languages_Indian_Towns.xlsx",
+    "Top_4_Languages_Indian_Towns_with_Pincode.xlsx",
+    "total_population_sum.xlsx",
+    "All_State_Bilingual_Data.xlsx",
+}
+
+
+def file_digest(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def list_workbooks(folder_path: str) -> list:
+    if not os.path.isdir(folder_path):
+        return []
+    return [
+        file_name for file_name in sorted(os.listdir(folder_path))
+        # "~$" files are the lock files Excel leaves next to an open workbook
+        if file_name.lower().endswith(".xlsx") and file_name not in REPORT_FILES and not file_name.startswith("~$")
+    ]
+
+
+def source_stats(data_dir: str, bilingual_dir: str, district_codes_path: str, pincode_path: str) -> dict:
+    # (mtime_ns, size) of every source file CensusStore.load would read
+    paths = [os.path.join(data_dir, name) for name in list_workbooks(data_dir)]
+    paths += [os.path.join(bilingual_dir, name) for name in list_workbooks(bilingual_dir)]
+    paths += [district_codes_path, pincode_path]
+
+    stats = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        stats[os.path.normpath(path)] = (stat.st_mtime_ns, stat.st_size)
+    return stats
+
+
+def downcast(series: pd.Series, dtype: str) -> pd.Series:
+    info = np.iinfo(dtype)
+    if len(series) and (series.min() < info.min or series.max() > info.max):
+        raise ValueError(f"{series.name} values {series.min()}..{series.max()} do not fit {dtype}")
+    return series.astype(dtype)
+
+
+def share_categories(frames, columns: list):
+    # Recode every frame against one sorted category Index per column, so
+    # each distinct name is stored once for all states
+    frames = list(frames)
+    for col in columns:
+        categories = sorted(set().union(*(df[col].cat.categories for df in frames)))
+        dtype = pd.CategoricalDtype(pd.Index(categories, dtype=object))
+        for df in frames:
+            df[col] = df[col].astype(dtype)
+
+
+def frame_memory(frames) -> int:
+    # Deep bytes of a group of frames; a category Index shared between them is counted once
+    seen = set()
+    total = 0
+    for df in frames:
+        total += int(df.index.memory_usage(deep=True))
+        for col in df.columns:
+            series = df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                total += series.cat.codes.nbytes
+                if id(series.dtype) not in seen:
+                    seen.add(id(series.dtype))
+                    total += int(series.cat.categories.memory_usage(deep=True))
+            else:
+                total += int(series.memory_usage(deep=True, index=False))
+    return total
+
+
+def load_c16(file_path: str) -> pd.DataFrame:
+    with stage("c16.read_excel"):
+        df = pd.read_excel(file_path, skiprows=3)
+    df.columns = C16_COLUMNS
+
+    with stage("c16.coerce"):
+        for col in CODE_COLUMNS:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+        # The sub-header rows ("code", "1 2 3 ...") carry no mother tongue code
+        df = df.dropna(subset=["Mother tongue code"]).reset_index(drop=True)
+
+        for col in CODE_COLUMNS:
+            df[col] = downcast(df[col], CODE_DTYPES[col])
+        for col in COUNT_COLUMNS:
+            df[col] = downcast(pd.to_numeric(df[col], errors='coerce').fillna(0), COUNT_DTYPE)
+
+    with stage("c16.normalise_names"):
+        df["Mother tongue name"] = normalise_language(df["Mother tongue name"].astype(str)).astype("category")
+        df["Area name"] = df["Area name"].astype(str).str.strip().astype("category")
+
+    # Every row of a workbook carries the same table id
+    return df.drop(columns=["Table name"])
+
+
+def load_c17(file_path: str) -> pd.DataFrame:
+    with stage("c17.read_excel"):
+        df = pd.read_excel(file_path, skiprows=5)
+    df.columns = C17_COLUMNS
+
+    with stage("c17.coerce"):
+        for col in C17_COLUMNS:
+            if col in C17_TEXT_COLUMNS:
+                df[col] = df[col].astype("string")
+            else:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def load_district_codes(file_path: str) -> pd.DataFrame:
+    df = pd.read_excel(file_path)
+    df.columns = df.columns.str.replace('\n', ' ').str.strip()
+
+    expected_columns = ['State', 'State Code', 'District Code', 'District Name']
+    if not all(col in df.columns for col in expected_columns):
+        raise ValueError(f"Expected columns {expected_columns} not found in census file. Actual columns: {df.columns.tolist()}")
+
+    for col in df.columns:
+        if col.endswith('Code'):
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        else:
+            df[col] = df[col].astype("string").str.strip()
+    return df
+
+
+def load_pincodes(file_path: str) -> pd.DataFrame:
+    df = pd.read_csv(file_path)
+    df['Office Name'] = df['Office Name'].astype("string")
+    return df
+
+
+class CensusStore:
+    def __init__(self, mother_tongue: dict, bilingual: dict, district_codes=None, pincodes=None, digests=None,
+                 previous=None):
+        # Frames carried over unchanged from ``previous`` (the snapshot being
+        # reloaded) keep their derived tables. They are shallow-copied before
+        # the categories are re-shared, so the live snapshot is never mutated.
+        kept = set()
+        if previous is not None:
+            kept = {stem for stem, df in mother_tongue.items() if previous.mother_tongue.get(stem) is df}
+            mother_tongue = {stem: df.copy(deep=False) if stem in kept else df for stem, df in mother_tongue.items()}
+        same_states = previous is not None and len(kept) == len(mother_tongue) == len(previous.mother_tongue)
+        same_bilingual = previous is not None and bilingual.keys() == previous.bilingual.keys() and all(
+            previous.bilingual[stem] is df for stem, df in bilingual.items()
+        )
+
+        # Both mappings are keyed by workbook stem, e.g. "Tamil_Nadu"
+        self.mother_tongue = mother_tongue
+        with stage("store.share_categories"):
+            share_categories(mother_tongue.values(), SHARED_CATEGORY_COLUMNS)
+        self.bilingual = bilingual
+        self.district_codes = district_codes
+        self.pincodes = pincodes
+        # sha256 of every source file; the dataset version changes whenever any of them does
+        self.digests = digests or {}
+        self.version = hashlib.sha256(
+            "".join(f"{path}={digest};" for path, digest in sorted(self.digests.items())).encode()
+        ).hexdigest()[:16]
+        self._mother_tongue_keys = {state_key(stem): stem for stem in mother_tongue}
+        self._bilingual_keys = {state_key(stem): stem for stem in bilingual}
+        # Seconds spent loading each source file, (mtime_ns, size) of every
+        # source and the arguments to load it again; all filled in by load()
+        self.load_seconds = {}
+        self.sources = {}
+        self.paths = None
+        with stage("store.district_index"):
+            if same_states and district_codes is previous.district_codes:
+                self.districts = previous.districts
+            else:
+                self.districts = DistrictIndex.build(district_codes, mother_tongue)
+        with stage("store.rankings"):
+            self.rankings = {
+                stem: previous.rankings[stem] if stem in kept else LanguageRankings.build(df)
+                for stem, df in mother_tongue.items()
+            }
+        with stage("store.rollups"):
+            self.rollups = RollupCube.build(
+                mother_tongue, {stem: previous.rollups.states[stem] for stem in kept}
+            )
+        with stage("store.language_mix"):
+            if same_states:
+                self.language_mix = previous.language_mix
+            else:
+                self.language_mix = LanguageMix.build(mother_tongue, self.rollups)
+        with stage("store.bilingual_index"):
+            self.bilingual_index = previous.bilingual_index if same_bilingual else BilingualIndex.build(bilingual)
+        with stage("store.pincode_index"):
+            if same_states and pincodes is previous.pincodes:
+                self.pincode_index = previous.pincode_index
+            else:
+                self.pincode_index = PincodeIndex.build(pincodes, mother_tongue)
+        with stage("store.search_index"):
+            if same_states and pincodes is previous.pincodes:
+                self.search_index = previous.search_index
+            else:
+                self.search_index = SearchIndex.build(mother_tongue, self.rollups, pincodes, self.pincode_index)
+        with stage("store.map_payload"):
+            self.map_payload = MapPayload.build(self)
+
+    @classmethod
+    def load(cls, data_dir: str = DATA_DIR, bilingual_dir: str = BILINGUAL_DATA_DIR,
+             district_codes_path: str = DISTRICT_CODES_PATH, pincode_path: str = PINCODE_PATH,
+             cache=None, previous=None) -> "CensusStore":
+        # cache is an optional census_cache.FrameCache; without one every source is parsed.
+        # With a previous snapshot, sources whose mtime and size are unchanged are
+        # taken over from it instead of being read again.
+        paths = (data_dir, bilingual_dir, district_codes_path, pincode_path)
+        digests = {}
+        load_seconds = {}
+        sources = {}
+
+        def read(file_path, loader, previous_df=None):
+            path = os.path.normpath(file_path)
+            stat = os.stat(file_path)
+            sources[path] = (stat.st_mtime_ns, stat.st_size)
+            if previous_df is not None and previous.sources.get(path) == sources[path]:
+                digests[path] = previous.digests[path]
+                return previous_df
+
+            start = time.perf_counter()
+            if cache is None:
+                df = loader(file_path)
+                digests[path] = file_digest(file_path)
+            else:
+                df = cache.load(file_path, loader)
+                digests[path] = cache.digest(file_path)
+            load_seconds[path] = time.perf_counter() - start
+            return df
+
+        previous_c16 = previous.mother_tongue if previous is not None else {}
+        previous_c17 = previous.bilingual if previous is not None else {}
+
+        mother_tongue = {}
+        for file_name in list_workbooks(data_dir):
+            stem = os.path.splitext(file_name)[0]
+            mother_tongue[stem] = read(os.path.join(data_dir, file_name), load_c16, previous_c16.get(stem))
+
+        bilingual = {}
+        for file_name in list_workbooks(bilingual_dir):
+            stem = os.path.splitext(file_name)[0]
+            bilingual[stem] = read(os.path.join(bilingual_dir, file_name), load_c17, previous_c17.get(stem))
+
+        district_codes = None
+        if os.path.exists(district_codes_path):
+            district_codes = read(district_codes_path, load_district_codes,
+                                  previous.district_codes if previous is not None else None)
+        pincodes = None
+        if os.path.exists(pincode_path):
+            pincodes = read(pincode_path, load_pincodes, previous.pincodes if previous is not None else None)
+
+        if cache is not None:
+            cache.save_manifest()
+
+        store = cls(mother_tongue, bilingual, district_codes, pincodes, digests, previous)
+        store.load_seconds = load_seconds
+        store.sources = sources
+        store.paths = paths
+        for path, seconds in load_seconds.items():
+            SOURCE_LOAD_SECONDS.set(path, value=round(seconds, 6))
+        return store
+
+    def changed_sources(self, current: dict = None) -> list:
+        """Source files added, modified or removed since this snapshot was loaded."""
+        current = current if current is not None else source_stats(*self.paths)
+        return sorted(path for path in current.keys() | self.sources.keys()
+                      if current.get(path) != self.sources.get(path))
+
+    def memory_usage(self) -> dict:
+        # Deep bytes per dataset, strings and categories included
+        frames = {"mother_tongue": self.mother_tongue.values(), "bilingual": self.bilingual.values()}
+        if self.district_codes is not None:
+            frames["district_codes"] = [self.district_codes]
+        if self.pincodes is not None:
+            frames["pincodes"] = [self.pincodes]
+        return {dataset: frame_memory(dfs) for dataset, dfs in frames.items()}
+
+    def state_stem(self, state_name: str):
+        # C-16 workbook stem of a state name, matched after normalisation and aliases
+        return self._mother_tongue_keys.get(state_key(state_name))
+
+    def state_rankings(self, state_name: str):
+        stem = self.state_stem(state_name)
+        return self.rankings[stem] if stem is not None else None
+
+    def state_rollup(self, state_name: str):
+        stem = self.state_stem(state_name)
+        return self.rollups.states[stem] if stem is not None else None
+
+    def bilingual_stem(self, state_name: str):
+        # Workbook stem to query bilingual_index with; "India" is the national sheet
+        return self._bilingual_keys.get(state_key(state_name))
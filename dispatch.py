@@ -0,0 +1,156 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import anyio
+from fastapi import HTTPException
+
+from metrics import REGISTRY, Counter
+
+# lane -> (kind, workers, requests allowed to wait beyond those, timeout seconds).
+# Each route names its lane, so a burst of reports can neither take the
+# threads map hovers run on nor queue up without bound. "process" lanes are
+# for pure-Python work (openpyxl) that would hold the GIL for seconds; their
+# workers run at a lower OS priority than the API process.
+LANES = {
+    "query": ("thread", int(os.environ.get("QUERY_THREADS", "8")), 256, 10.0),
+    "report": ("thread", int(os.environ.get("REPORT_THREADS", "2")), 4, 600.0),
+    "write": ("process", int(os.environ.get("WRITE_PROCESSES", "1")), 4, 600.0),
+    "export": ("thread", int(os.environ.get("EXPORT_THREADS", "2")), 4, 600.0),
+    "admin": ("thread", 1, 1, 600.0),
+}
+
+# Added to the niceness of process lane workers
+PROCESS_NICENESS = 10
+
+DISPATCHED = REGISTRY.register(Counter(
+    "census_dispatch_total", "Work dispatched to the compute lanes by outcome", ("lane", "result")
+))
+
+
+def _lower_priority():
+    # os.nice is POSIX only; on Windows the workers keep the API's priority
+    if hasattr(os, "nice"):
+        os.nice(PROCESS_NICENESS)
+
+
+class Lane:
+    def __init__(self, name: str, kind: str, workers: int, queue_depth: int, timeout: float):
+        self.name = name
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        if kind == "process":
+            self.limiter = None
+            self.executor = ProcessPoolExecutor(workers, initializer=_lower_priority)
+        else:
+            self.limiter = anyio.CapacityLimiter(workers)
+            self.executor = None
+        # Running plus waiting; only touched from the event loop
+        self.admitted = 0
+
+    @property
+    def running(self) -> int:
+        if self.limiter is not None:
+            return int(self.limiter.borrowed_tokens)
+        return min(self.admitted, self.workers)
+
+    def submit(self, fn, *args) -> asyncio.Future:
+        if self.executor is not None:
+            return asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        return asyncio.ensure_future(anyio.to_thread.run_sync(fn, *args, limiter=self.limiter))
+
+    def _finished(self, future: asyncio.Future):
+        self.admitted -= 1
+        if not future.cancelled():
+            # Retrieved here too, so a call that outlived its timeout is not logged as unhandled
+            future.exception()
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+
+class ComputeDispatcher:
+    """Runs blocking pandas work off the event loop in bounded per-lane pools.
+
+    A lane that already has ``workers + queue_depth`` calls admitted answers
+    429 at once; a call that does not finish within the lane's timeout
+    answers 504. The work itself cannot be interrupted, so it keeps its
+    slot until it really finishes and the lane's bound stays honest.
+    """
+
+    def __init__(self, lanes: dict = LANES):
+        self.lanes = {name: Lane(name, *config) for name, config in lanes.items()}
+
+    def _admit(self, lane_name: str) -> Lane:
+        lane = self.lanes[lane_name]
+        if lane.admitted >= lane.workers + lane.queue_depth:
+            DISPATCHED.inc(lane.name, "rejected")
+            raise HTTPException(
+                status_code=429, detail=f"Too many {lane.name} requests in progress, retry shortly",
+                headers={"Retry-After": "1"}
+            )
+        lane.admitted += 1
+        return lane
+
+    async def run(self, lane_name: str, fn, *args):
+        lane = self._admit(lane_name)
+        future = lane.submit(fn, *args)
+        future.add_done_callback(lane._finished)
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), lane.timeout)
+        except asyncio.TimeoutError:
+            DISPATCHED.inc(lane.name, "timeout")
+            raise HTTPException(status_code=504, detail=f"{lane.name} work did not finish within {lane.timeout:g}s")
+        except HTTPException:
+            DISPATCHED.inc(lane.name, "ok")
+            raise
+        except Exception:
+            DISPATCHED.inc(lane.name, "error")
+            raise
+        DISPATCHED.inc(lane.name, "ok")
+        return result
+
+    def stream(self, lane_name: str, chunks):
+        """Admit a streamed body into a thread lane and produce each of its chunks there.
+
+        Call it before the response starts, so a full lane still answers 429.
+        The stream holds its admission until it ends; past the lane's timeout
+        it is cut off, which the client sees as a truncated transfer.
+        """
+        lane = self._admit(lane_name)
+        return self._produce(lane, iter(chunks))
+
+    async def _produce(self, lane: Lane, chunks):
+        deadline = time.monotonic() + lane.timeout
+        result = "ok"
+        try:
+            while True:
+                chunk = await anyio.to_thread.run_sync(next, chunks, None, limiter=lane.limiter)
+                if chunk is None:
+                    break
+                if time.monotonic() > deadline:
+                    result = "timeout"
+                    raise TimeoutError(f"{lane.name} stream did not finish within {lane.timeout:g}s")
+                yield chunk
+        except TimeoutError:
+            raise
+        except BaseException:
+            result = "error"
+            raise
+        finally:
+            lane.admitted -= 1
+            DISPATCHED.inc(lane.name, result)
+
+    def occupancy(self) -> dict:
+        samples = {}
+        for lane in self.lanes.values():
+            samples[(lane.name, "running")] = lane.running
+            samples[(lane.name, "queued")] = max(lane.admitted - lane.running, 0)
+        return samples
+
+    def shutdown(self):
+        for lane in self.lanes.values():
+            lane.shutdown()
@@ -0,0 +1,62 @@
+from census_schema import district_total_rows, name_key, state_key
+
+
+class DistrictIndex:
+    """(state, district) -> district code, built once from District_Codes.xlsx and the C-16 district rows."""
+
+    def __init__(self):
+        # state key -> {district key: district code}
+        self._codes = {}
+        # state key -> {district code: display name}
+        self._names = {}
+
+    def _add(self, state_name: str, district_name: str, district_code: int):
+        skey = state_key(state_name)
+        self._codes.setdefault(skey, {}).setdefault(name_key(district_name), district_code)
+        self._names.setdefault(skey, {}).setdefault(district_code, district_name)
+
+    @classmethod
+    def build(cls, district_codes, mother_tongue: dict) -> "DistrictIndex":
+        index = cls()
+
+        if district_codes is not None:
+            districts = district_codes.dropna(subset=['District Code', 'District Name'])
+            districts = districts.drop_duplicates(subset=['State', 'District Code'])
+            for state_name, district_name, district_code in zip(
+                districts['State'], districts['District Name'], districts['District Code']
+            ):
+                index._add(state_name, district_name, int(district_code))
+
+        # The workbooks themselves cover states missing from District_Codes.xlsx (e.g. Lakshadweep)
+        for stem, df in mother_tongue.items():
+            districts = district_total_rows(df)
+            for district_name, district_code in zip(districts['Area name'], districts['District code']):
+                index._add(stem, str(district_name), int(district_code))
+
+        return index
+
+    def _state(self, state_name: str):
+        key = state_key(state_name)
+        return key if key in self._codes else None
+
+    def lookup(self, state_name: str, district_name: str):
+        # Exact after normalisation: a near miss ("South East") is usually another real district
+        skey = self._state(state_name)
+        if skey is None:
+            return None
+        return self._codes[skey].get(name_key(district_name))
+
+    def names(self, state_name: str) -> dict:
+        # district code -> display name, empty for an unknown state
+        skey = self._state(state_name)
+        return self._names[skey] if skey is not None else {}
+
+    def districts(self, state_name: str):
+        skey = self._state(state_name)
+        if skey is None:
+            return None
+        names = self._names[skey]
+        return sorted(
+            ({"district_code": code, "district_name": name} for code, name in names.items()),
+            key=lambda district: district["district_name"]
+        )
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+from census_schema import COUNT_COLUMNS, district_total_rows, state_name
+from rollups import diversity_indices
+
+DIVERSITY_INDICES = ["shannon", "herfindahl"]
+
+
+class LanguageMix:
+    """District x mother tongue group matrix of every state, with diversity and similarity precomputed.
+
+    Built from the rollup cube's district group counts: one row per
+    (state, district), one column per group that any district speaks. For
+    every metric it keeps each district's group shares, their L2 norm, the
+    Shannon entropy (natural log) and the Herfindahl index (sum of squared
+    shares). At ~640 x ~120 the matrix is small enough to stay dense, so a
+    nearest-district query is a single matrix-vector product.
+    """
+
+    def __init__(self, stems: np.ndarray, district_codes: np.ndarray, district_names: np.ndarray,
+                 languages: np.ndarray, totals: np.ndarray, shares: np.ndarray, norms: np.ndarray,
+                 shannon: np.ndarray, herfindahl: np.ndarray, spoken: np.ndarray):
+        # Per row: workbook stem, district code and name
+        self.stems = stems
+        self.district_codes = district_codes
+        self.district_names = district_names
+        self.languages = languages
+        # Indexed [metric, row] (and [..., language] for shares), metrics in COUNT_COLUMNS order
+        self.totals = totals
+        self.shares = shares
+        self.norms = norms
+        self.shannon = shannon
+        self.herfindahl = herfindahl
+        # Groups with at least one speaker
+        self.spoken = spoken
+        self.rows = {(stem, int(code)): row for row, (stem, code) in enumerate(zip(stems, district_codes))}
+        self.state_rows = {}
+        for row, stem in enumerate(stems):
+            self.state_rows.setdefault(stem, []).append(row)
+
+    @classmethod
+    def build(cls, mother_tongue: dict, rollups) -> "LanguageMix":
+        stems, codes, names, parts = [], [], [], []
+        for stem, df in mother_tongue.items():
+            groups = rollups.states[stem].groups
+            districts = district_total_rows(df)
+            district_names = dict(zip(districts['District code'].astype(int), districts['Area name'].astype(str)))
+
+            keys = np.array(list(groups.keys), dtype=np.int64)
+            group_ids = np.repeat(np.arange(len(keys)), np.diff(groups.offsets))
+            keep = keys[group_ids] != 0
+            # Group ids shifted past the state row (code 0), so they index this state's district rows
+            districts_kept = keys[keys != 0]
+            row_of_group = np.full(len(keys), -1)
+            row_of_group[keys != 0] = np.arange(len(districts_kept)) + len(codes)
+
+            stems.extend([stem] * len(districts_kept))
+            codes.extend(districts_kept.tolist())
+            names.extend(district_names.get(int(code)) for code in districts_kept)
+            parts.append((
+                row_of_group[group_ids[keep]],
+                groups.categories[groups.languages[keep]],
+                groups.values[keep],
+            ))
+
+        if parts:
+            rows = np.concatenate([part[0] for part in parts])
+            labels = np.concatenate([part[1] for part in parts])
+            values = np.concatenate([part[2] for part in parts]).astype(np.int64)
+        else:
+            rows, labels, values = np.array([], dtype=np.int64), np.array([], dtype=object), np.zeros((0, len(COUNT_COLUMNS)))
+        column_of_label, languages = pd.factorize(labels, sort=True)
+
+        counts = np.zeros((len(COUNT_COLUMNS), len(codes), len(languages)), dtype=np.int64)
+        counts[:, rows, column_of_label] = values.T
+
+        totals = counts.sum(axis=2)
+        shares, shannon, herfindahl = diversity_indices(counts)
+        norms = np.sqrt(herfindahl)
+
+        return cls(
+            np.array(stems, dtype=object), np.array(codes, dtype=np.int64), np.array(names, dtype=object),
+            np.asarray(languages, dtype=object), totals, shares.astype(np.float32), norms,
+            shannon, herfindahl, (counts > 0).sum(axis=2),
+        )
+
+    def _district(self, row: int, m: int) -> dict:
+        populated = self.totals[m, row] > 0
+        return {
+            "state": state_name(self.stems[row]),
+            "district": self.district_names[row],
+            "district_code": int(self.district_codes[row]),
+            "population": int(self.totals[m, row]),
+            "languages": int(self.spoken[m, row]),
+            "shannon": round(float(self.shannon[m, row]), 4) if populated else None,
+            "herfindahl": round(float(self.herfindahl[m, row]), 4) if populated else None,
+        }
+
+    def diversity(self, stem: str = None, metric: str = "Total P", order_by: str = "shannon",
+                  descending: bool = True, num_districts: int = None) -> list:
+        """Districts of one state (every state when ``stem`` is None) ranked by a diversity index."""
+        m = COUNT_COLUMNS.index(metric)
+        rows = np.array(self.state_rows.get(stem, []) if stem is not None else range(len(self.stems)), dtype=np.int64)
+        rows = rows[self.totals[m, rows] > 0]
+        index = getattr(self, order_by)[m, rows]
+        rows = rows[np.argsort(-index if descending else index, kind="stable")]
+        if num_districts is not None:
+            rows = rows[:max(num_districts, 0)]
+        return [self._district(row, m) for row in rows]
+
+    def similar(self, stem: str, district_code: int, metric: str = "Total P", num_districts: int = 10,
+                same_state: bool = False):
+        """Districts whose mother tongue group mix is closest by cosine similarity, or None for an unknown district."""
+        row = self.rows.get((stem, district_code))
+        if row is None:
+            return None
+        m = COUNT_COLUMNS.index(metric)
+        if self.norms[m, row] == 0:
+            return []
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            similarity = (self.shares[m] @ self.shares[m, row]) / (self.norms[m] * self.norms[m, row])
+        candidates = self.norms[m] > 0
+        candidates[row] = False
+        if same_state:
+            candidates &= self.stems == stem
+        rows = np.flatnonzero(candidates)
+        rows = rows[np.argsort(-similarity[rows], kind="stable")][:max(num_districts, 0)]
+        return [
+            {**self._district(r, m), "similarity": round(float(similarity[r]), 4)}
+            for r in rows
+        ]
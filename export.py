@@ -0,0 +1,131 @@
+import io
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+
+# format -> (media type, file extension)
+FORMATS = {
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ".xlsx"),
+    "csv": ("text/csv; charset=utf-8", ".csv"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+
+# Rows encoded per chunk; keeps every write small no matter how big a state is
+CHUNK_ROWS = 5000
+
+
+def _chunks(frames):
+    for frame in frames:
+        for start in range(0, len(frame), CHUNK_ROWS):
+            yield frame.iloc[start:start + CHUNK_ROWS]
+
+
+def _cell(value):
+    # openpyxl cannot store lists (e.g. the town report's pincodes); write them the way to_excel does
+    if isinstance(value, (list, tuple)):
+        return str(value)
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return value
+
+
+def stream_csv(frames):
+    columns = None
+    for chunk in _chunks(frames):
+        if columns is None:
+            columns = list(chunk.columns)
+            yield chunk.to_csv(index=False).encode()
+        else:
+            yield chunk.reindex(columns=columns).to_csv(index=False, header=False).encode()
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose buffered bytes are handed out as they are written."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _parquet_ready(chunk: pd.DataFrame) -> pd.DataFrame:
+    # Parquet columns hold one type; the share report mixes counts and "72.99%" strings in a column
+    mixed = [
+        column for column in chunk.columns
+        if chunk[column].dtype == object and chunk[column].map(lambda v: isinstance(v, str)).any()
+    ]
+    if not mixed:
+        return chunk
+    return chunk.astype({column: "string" for column in mixed})
+
+
+def _parquet_schema(chunk: pd.DataFrame) -> pa.Schema:
+    schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+    # A first chunk of all-empty values infers null types; widen them so later chunks fit
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            schema = schema.set(i, field.with_type(pa.string()))
+        elif pa.types.is_list(field.type) and pa.types.is_null(field.type.value_type):
+            schema = schema.set(i, field.with_type(pa.list_(pa.int64())))
+    return schema.remove_metadata()
+
+
+def stream_parquet(frames):
+    sink = _DrainableSink()
+    writer = None
+    schema = None
+    for chunk in _chunks(frames):
+        chunk = _parquet_ready(chunk)
+        if writer is None:
+            schema = _parquet_schema(chunk)
+            writer = pq.ParquetWriter(sink, schema)
+        writer.write_table(pa.Table.from_pandas(chunk.reindex(columns=schema.names), schema=schema, preserve_index=False))
+        data = sink.drain()
+        if data:
+            yield data
+
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+def save_xlsx(frames, file_path: str):
+    # openpyxl is pure Python and holds the GIL throughout; the export endpoint runs this in a separate process.
+    # Write-only mode keeps only the current row in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    columns = None
+    for chunk in _chunks(frames):
+        if columns is None:
+            columns = list(chunk.columns)
+            sheet.append(columns)
+        for row in chunk.reindex(columns=columns).itertuples(index=False, name=None):
+            sheet.append([_cell(value) for value in row])
+    workbook.save(file_path)
+
+
+# XLSX is not streamed: the export endpoint writes it whole with save_xlsx
+STREAMERS = {
+    "csv": stream_csv,
+    "parquet": stream_parquet,
+}
+
+
+def stream_frames(frames, fmt: str):
+    return STREAMERS[fmt](frames)
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import ARTIFACT_CACHE
+from reports import REPORTS, write_xlsx
+
+ARTIFACT_DIR = ".census_artifacts"
+
+# Finished jobs kept for polling before the oldest are forgotten
+MAX_JOBS = 256
+
+
+def artifact_key(report: str, params: dict, dataset_version: str) -> str:
+    payload = json.dumps({"report": report, "params": params, "dataset": dataset_version}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+class Job:
+    def __init__(self, report: str, params: dict, key: str, artifact_path: str):
+        self.id = uuid.uuid4().hex
+        self.report = report
+        self.params = params
+        self.key = key
+        self.artifact_path = artifact_path
+        self.status = "queued"
+        self.progress = 0.0
+        self.error = None
+        self.cached = False
+        self.state_timings = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "report": self.report,
+            "params": self.params,
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "cached": self.cached,
+            "error": self.error,
+            "state_timings": self.state_timings,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "artifact_url": f"/jobs/{self.id}/artifact" if self.status == "done" else None,
+        }
+
+
+class JobManager:
+    """Runs report builds in the background, one build per distinct (report, params, dataset)."""
+
+    def __init__(self, artifact_dir: str = ARTIFACT_DIR, executor=None, writer=None, max_concurrent: int = 1):
+        self.artifact_dir = artifact_dir
+        # Process pool the report engine fans states out to
+        self.executor = executor
+        # Process pool the workbook is written in (the dispatcher's "write" lane); openpyxl
+        # would otherwise hold the API process's GIL for the whole write
+        self.writer = writer
+        self._threads = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="report-job")
+        self._jobs = OrderedDict()
+        self._active = {}
+        self._lock = threading.Lock()
+
+    def submit(self, report: str, params: dict, store) -> Job:
+        key = artifact_key(report, params, store.version)
+        artifact_path = os.path.join(self.artifact_dir, key + ".xlsx")
+
+        with self._lock:
+            # Identical request already queued or running: share its job
+            if key in self._active:
+                ARTIFACT_CACHE.inc("shared")
+                return self._active[key]
+
+            job = Job(report, params, key, artifact_path)
+            self._remember(job)
+
+            if os.path.exists(artifact_path):
+                job.status = "done"
+                job.progress = 1.0
+                job.cached = True
+                job.finished_at = job.created_at
+                ARTIFACT_CACHE.inc("hit")
+                return job
+
+            ARTIFACT_CACHE.inc("miss")
+            self._active[key] = job
+
+        self._threads.submit(self._run, job, store)
+        return job
+
+    def get(self, job_id: str):
+        return self._jobs.get(job_id)
+
+    def download_name(self, job: Job) -> str:
+        return REPORTS[job.report][2]
+
+    def shutdown(self):
+        self._threads.shutdown(wait=False, cancel_futures=True)
+
+    def _remember(self, job: Job):
+        self._jobs[job.id] = job
+        while len(self._jobs) > MAX_JOBS:
+            oldest = next(iter(self._jobs.values()))
+            if oldest.status in ("queued", "running"):
+                break
+            self._jobs.popitem(last=False)
+
+    def _run(self, job: Job, store):
+        builder = REPORTS[job.report][0]
+        job.status = "running"
+        job.started_at = time.time()
+
+        def progress(done, total):
+            job.progress = done / total
+
+        try:
+            report_df, timings = builder(store, job.params["num_languages"], executor=self.executor, progress=progress)
+            if report_df.empty:
+                raise ValueError("No data found for any state")
+
+            os.makedirs(self.artifact_dir, exist_ok=True)
+            tmp_path = os.path.join(self.artifact_dir, f"{job.key}.{job.id}.tmp.xlsx")
+            if self.writer is not None:
+                self.writer.submit(write_xlsx, report_df, tmp_path).result()
+            else:
+                write_xlsx(report_df, tmp_path)
+            os.replace(tmp_path, job.artifact_path)
+
+            job.state_timings = timings
+            job.progress = 1.0
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._active.pop(job.key, None)
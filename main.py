@@ -1,10 +1,73 @@
-from fastapi import FastAPI, HTTPException
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, RedirectResponse, StreamingResponse
 from pydantic import BaseModel
-import pandas as pd
+from typing import List, Optional
 import os
+import secrets
+import tempfile
+import time
 from fastapi.middleware.cors import CORSMiddleware
-
-app = FastAPI()
+from starlette.background import BackgroundTask
+
+from bilingual import PERSON_COLUMNS, SUBSIDIARY_LEVELS
+from census_cache import FrameCache
+from census_schema import COUNT_COLUMNS
+from census_store import CensusStore
+from dispatch import ComputeDispatcher
+from diversity import DIVERSITY_INDICES
+from jobs import JobManager
+from metrics import CONTENT_TYPE, REGISTRY, REQUEST_SECONDS, REQUESTS, CallbackGauge, Gauge, stage
+from reloader import DataReloader
+from response_cache import CACHE_CONTROL, IMMUTABLE_CACHE_CONTROL, ResponseCache, etag_matches, response_etag
+from query import QueryPlan
+from search import KINDS as SEARCH_KINDS
+import export
+import reports
+
+
+# The snapshot the current request reads from. Pinned once per request, so a
+# reload swapping app.state.store mid-request never mixes two dataset versions.
+request_store = ContextVar("request_store", default=None)
+
+
+def current_store() -> CensusStore:
+    store = request_store.get()
+    return store if store is not None else app.state.store
+
+
+def publish_store(store: CensusStore):
+    # A single attribute assignment: requests already running keep the old snapshot
+    app.state.store = store
+    for dataset, size in store.memory_usage().items():
+        FRAME_MEMORY.set(dataset, value=size)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Parse every census workbook once (or map it from the Parquet cache);
+    # handlers only read from the store
+    cache = FrameCache()
+    publish_store(CensusStore.load(cache=cache))
+    FRAME_CACHE_FILES.set("reused", value=len(cache.reused))
+    FRAME_CACHE_FILES.set("rebuilt", value=len(cache.rebuilt))
+    app.state.reloader = DataReloader(lambda: app.state.store, publish_store)
+    app.state.reloader.start()
+    app.state.report_pool = ProcessPoolExecutor(reports.REPORT_WORKERS) if reports.REPORT_WORKERS > 1 else None
+    app.state.dispatcher = ComputeDispatcher()
+    app.state.jobs = JobManager(executor=app.state.report_pool, writer=app.state.dispatcher.lanes["write"].executor)
+    app.state.responses = ResponseCache()
+    yield
+    app.state.reloader.stop()
+    app.state.jobs.shutdown()
+    app.state.dispatcher.shutdown()
+    if app.state.report_pool is not None:
+        app.state.report_pool.shutdown(cancel_futures=True)
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -15,287 +78,391 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+FRAME_CACHE_FILES = REGISTRY.register(Gauge(
+    "census_frame_cache_files", "Source files served from the Parquet cache or re-parsed at startup", ("result",)
+))
+
+FRAME_MEMORY = REGISTRY.register(Gauge(
+    "census_frame_memory_bytes", "Deep memory usage of the loaded census frames", ("dataset",)
+))
+
+def response_cache_requests() -> dict:
+    responses = getattr(app.state, "responses", None)
+    if responses is None:
+        return {}
+    return {("hit",): responses.hits, ("miss",): responses.misses}
+
+def response_cache_bytes() -> dict:
+    responses = getattr(app.state, "responses", None)
+    return {(): responses.size} if responses is not None else {}
+
+REGISTRY.register(CallbackGauge(
+    "census_response_cache_requests_total", "GET query lookups in the serialised response LRU", ("result",),
+    response_cache_requests, kind="counter"
+))
+REGISTRY.register(CallbackGauge(
+    "census_response_cache_bytes", "Bytes of serialised JSON held by the response LRU", (), response_cache_bytes
+))
+
+def dispatch_occupancy() -> dict:
+    dispatcher = getattr(app.state, "dispatcher", None)
+    return dispatcher.occupancy() if dispatcher is not None else {}
+
+REGISTRY.register(CallbackGauge(
+    "census_dispatch_requests", "Calls running in or waiting for each compute lane", ("lane", "state"), dispatch_occupancy
+))
+
+@app.middleware("http")
+async def pin_store_snapshot(request: Request, call_next):
+    request_store.set(app.state.store)
+    return await call_next(request)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template so path parameters don't create a series each
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        REQUEST_SECONDS.observe(request.method, path, value=time.perf_counter() - start)
+        REQUESTS.inc(request.method, path, str(status))
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
 class RequestModel(BaseModel):
     state_name: str
     num_languages: int
+    metric: str = "Urban P"
     
 class DistrictRequestModel(BaseModel):
     state_name: str
     district_name: str
     num_languages: int
+    metric: str = "Urban P"
 
-@app.post("/most_spoken_languages/")
-async def most_spoken_languages(request: RequestModel):
-    state_name = request.state_name
-    num_languages = request.num_languages
-    file_name = state_name.replace(" ", "_") + ".xlsx"
-    file_path = os.path.join("data", file_name)
+def check_metric(metric: str):
+    if metric not in COUNT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"Unknown metric '{metric}', expected one of {COUNT_COLUMNS}")
 
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="File not found")
+async def dispatch(lane: str, fn, *args):
+    # Blocking work runs in the lane's bounded thread pool, never on the event loop
+    return await app.state.dispatcher.run(lane, fn, *args)
 
-    try:
-        df = pd.read_excel(file_path, skiprows=3)
-        
-        df.columns = [
-            "Table name", "State code", "District code", "Town code", "Area name",
-            "Mother tongue code", "Mother tongue name", "Unnamed: 7", "Unnamed: 8",
-            "Unnamed: 9", "Rural P", "Unnamed: 11", "Unnamed: 12",
-            "Urban P", "Unnamed: 14", "Unnamed: 15"
-        ]
-
-        df.columns = df.columns.str.strip()
-        
-        df['District code'] = df['District code'].astype(str)
-        df_filtered = df[df['District code'] == '0.0']
-        
-        if 'Mother tongue name' not in df_filtered.columns or 'Urban P' not in df_filtered.columns:
-            raise HTTPException(status_code=500, detail="'Mother tongue name' or 'Urban P' column not found")
-
-        df_filtered['Mother tongue name'] = df_filtered['Mother tongue name'].str.strip().str.replace(r'^\d+\s*', '', regex=True).str.strip().str.lower()
-
-        # df_grouped = df_filtered[['Mother tongue name', 'Urban P']].groupby('Mother tongue name').sum().reset_index()
-        
-        df_filtered = df_filtered.sort_values(by='Urban P', ascending=False)
-        
-        df_reversed = df_filtered.iloc[::-1]
-        
-        df_deduped_reversed = df_reversed.drop_duplicates(subset=['Mother tongue name'], keep='first')
-        
-        df_filtered = df_deduped_reversed.iloc[::-1]
-        
-        df_grouped = df_filtered[['Mother tongue name', 'Urban P']]
-
-
-
-        df_sorted = df_grouped.sort_values(by='Urban P', ascending=False)
-
-        top_languages = df_sorted.head(num_languages).to_dict(orient='records')
+async def cached_json(request: Request, key: tuple, compute) -> Response:
+    # The ETag depends only on the dataset version and the query, so a
+    # revalidation is answered without computing or serialising anything
+    etag = response_etag(current_store().version, key)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    def render() -> bytes:
+        result = compute()
+        with stage("json.serialise"):
+            return JSONResponse(result).body
+
+    body = app.state.responses.get(etag)
+    if body is None:
+        body = await dispatch("query", render)
+        app.state.responses.put(etag, body)
+
+    return Response(body, media_type="application/json", headers=headers)
 
+def query_top_languages(rankings, state_name: str, district_name: Optional[str], num_languages: int, metric: str) -> dict:
+    check_metric(metric)
+
+    if district_name is None:
+        top_languages = rankings.state.top(None, metric, num_languages) or []
         return {"state": state_name, "top_languages": top_languages}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
 
-def get_district_code(state_name: str, district_name: str) -> str:
-    census_file_path = r"./District_Codes.xlsx"
-    if not os.path.exists(census_file_path):
-        raise HTTPException(status_code=404, detail="Census file not found")
+    district_code = get_district_code(state_name, district_name)
+    top_languages = rankings.district.top(int(district_code), metric, num_languages) or []
+    return {"state": state_name, "district": district_name, "top_languages": top_languages}
 
-    census_df = pd.read_excel(census_file_path)
-    
-    print("Columns in census file:", census_df.columns.tolist())
+def most_spoken_languages_query(state_name: str, num_languages: int, metric: str) -> dict:
+    rankings = current_store().state_rankings(state_name)
 
-    census_df.columns = census_df.columns.str.replace('\n', ' ').str.strip()
-    
-    expected_columns = ['State', 'State Code', 'District Code', 'District Name']
-    if not all(col in census_df.columns for col in expected_columns):
-        raise HTTPException(status_code=500, detail=f"500: Expected columns {expected_columns} not found in census file. Actual columns: {census_df.columns.tolist()}")
+    if rankings is None:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    return query_top_languages(rankings, state_name, None, num_languages, metric)
+
+@app.post("/most_spoken_languages/")
+async def most_spoken_languages(request: RequestModel):
+    return await dispatch(
+        "query", most_spoken_languages_query, request.state_name, request.num_languages, request.metric
+    )
+
+@app.get("/most_spoken_languages/")
+async def most_spoken_languages_get(request: Request, state_name: str, num_languages: int, metric: str = "Urban P"):
+    return await cached_json(
+        request,
+        ("most_spoken_languages", state_name, num_languages, metric),
+        lambda: most_spoken_languages_query(state_name, num_languages, metric)
+    )
 
-    row = census_df[(census_df['State'].str.strip().str.lower() == state_name.strip().lower()) &
-                    (census_df['District Name'].str.strip().str.lower() == district_name.strip().lower())]
+def get_district_code(state_name: str, district_name: str) -> str:
+    district_code = current_store().districts.lookup(state_name, district_name)
 
-    if row.empty:
+    if district_code is None:
         raise HTTPException(status_code=404, detail="District not found in census file")
 
-    district_code = row.iloc[0]['District Code']
     return str(district_code)
 
-@app.post("/district_languages/")
-async def district_languages(request: DistrictRequestModel):
-    state_name = request.state_name
-    district_name = request.district_name
-    num_languages = request.num_languages
-    file_name = state_name.replace(" ", "_") + ".xlsx"
-    file_path = os.path.join("data", file_name)
+@app.get("/districts/{state_name}")
+async def districts(state_name: str):
+    state_districts = await dispatch("query", current_store().districts.districts, state_name)
 
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="State file not found")
+    if state_districts is None:
+        raise HTTPException(status_code=404, detail="State not found")
 
-    try:
-        district_code = get_district_code(state_name, district_name)
-        print(f"District code for {district_name} in {state_name} is {district_code}")
+    return {"state": state_name, "districts": state_districts}
 
-        df = pd.read_excel(file_path, skiprows=3)
-        
-        df.columns = [
-            "Table name", "State code", "District code", "Town code", "Area name",
-            "Mother tongue code", "Mother tongue name", "Unnamed: 7", "Unnamed: 8",
-            "Unnamed: 9", "Rural P", "Unnamed: 11", "Unnamed: 12",
-            "Urban P", "Unnamed: 14", "Unnamed: 15"
-        ]
+def district_languages_query(state_name: str, district_name: str, num_languages: int, metric: str) -> dict:
+    rankings = current_store().state_rankings(state_name)
 
-        # Print dataframe for debugging
-        print("Dataframe after reading the file:")
-        print(df.head())
-        
-        print(df.dtypes)
+    if rankings is None:
+        raise HTTPException(status_code=404, detail="State file not found")
 
-        df.columns = df.columns.str.strip()
-        
-        df['District code'] = pd.to_numeric(df['District code'], errors='coerce')
+    return query_top_languages(rankings, state_name, district_name, num_languages, metric)
 
-        district_code = float(district_code)
+@app.post("/district_languages/")
+async def district_languages(request: DistrictRequestModel):
+    return await dispatch(
+        "query", district_languages_query,
+        request.state_name, request.district_name, request.num_languages, request.metric
+    )
+
+@app.get("/district_languages/")
+async def district_languages_get(request: Request, state_name: str, district_name: str, num_languages: int,
+                                 metric: str = "Urban P"):
+    return await cached_json(
+        request,
+        ("district_languages", state_name, district_name, num_languages, metric),
+        lambda: district_languages_query(state_name, district_name, num_languages, metric)
+    )
+
+
+class BatchQueryModel(BaseModel):
+    state_name: str
+    district_name: Optional[str] = None
+    num_languages: int
+    metric: str = "Urban P"
+
+class BatchRequestModel(BaseModel):
+    queries: List[BatchQueryModel]
+
+# Upper bound on queries per batch; the whole map is 36 states
+MAX_BATCH_QUERIES = 1000
+
+@app.post("/batch_languages/")
+async def batch_languages(request: BatchRequestModel):
+    if len(request.queries) > MAX_BATCH_QUERIES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_QUERIES} queries per batch")
+
+    return await dispatch("query", batch_languages_query, request.queries)
+
+def batch_languages_query(queries: List[BatchQueryModel]) -> dict:
+    store = current_store()
+    rankings_by_state = {}
+    results = []
+
+    # A failing query reports its own error instead of failing the batch
+    for query in queries:
+        if query.state_name not in rankings_by_state:
+            rankings_by_state[query.state_name] = store.state_rankings(query.state_name)
+        rankings = rankings_by_state[query.state_name]
+
+        try:
+            if rankings is None:
+                raise HTTPException(status_code=404, detail="State file not found")
+            results.append(query_top_languages(
+                rankings, query.state_name, query.district_name, query.num_languages, query.metric
+            ))
+        except HTTPException as e:
+            result = {"state": query.state_name}
+            if query.district_name is not None:
+                result["district"] = query.district_name
+            result["error"] = {"status_code": e.status_code, "detail": e.detail}
+            results.append(result)
+
+    return {"results": results}
+    
+def rollup_query(state_name: str, district_name: Optional[str]):
+    rollup = current_store().state_rollup(state_name)
 
-        df_filtered = df[df['District code'] == district_code]
+    if rollup is None:
+        raise HTTPException(status_code=404, detail="State file not found")
 
-        print(f"Dataframe after filtering 'District code' == '{district_code}':")
-        print(df_filtered.head())
+    district_code = int(get_district_code(state_name, district_name)) if district_name is not None else 0
+    if district_code not in rollup.totals:
+        raise HTTPException(status_code=404, detail="District not found in census file")
 
-        if 'Mother tongue name' not in df_filtered.columns or 'Urban P' not in df_filtered.columns:
-            raise HTTPException(status_code=500, detail="'Mother tongue name' or 'Urban P' column not found")
+    result = {"state": state_name}
+    if district_name is not None:
+        result["district"] = district_name
+    return rollup, district_code, result
+
+@app.get("/totals/")
+async def all_totals(request: Request):
+    def compute():
+        rollups = current_store().rollups
+        states = rollups.state_totals()
+        states["State"] = states["State"].map(reports.state_name)
+        return {"states": states.to_dict(orient="records"), "india": rollups.national_total()}
+
+    return await cached_json(request, ("totals",), compute)
+
+@app.get("/totals/{state_name}")
+async def state_totals(request: Request, state_name: str, district_name: Optional[str] = None):
+    def compute():
+        rollup, district_code, result = rollup_query(state_name, district_name)
+        result["totals"] = rollup.total(district_code)
+        return result
+
+    return await cached_json(request, ("totals", state_name, district_name), compute)
+
+@app.get("/shares/{state_name}")
+async def language_shares(request: Request, state_name: str, district_name: Optional[str] = None,
+                          metric: str = "Total P", num_languages: int = 10):
+    def compute():
+        check_metric(metric)
+        rollup, district_code, result = rollup_query(state_name, district_name)
+        total, languages = rollup.shares(district_code, metric, num_languages)
+        result.update({"metric": metric, "total": total, "languages": languages})
+        return result
+
+    return await cached_json(request, ("shares", state_name, district_name, metric, num_languages), compute)
+
+def check_diversity_index(order_by: str):
+    if order_by not in DIVERSITY_INDICES:
+        raise HTTPException(status_code=400, detail=f"Unknown index '{order_by}', expected one of {DIVERSITY_INDICES}")
+
+@app.get("/diversity")
+async def national_diversity(request: Request, metric: str = "Total P", order_by: str = "shannon",
+                             descending: bool = True, num_districts: int = 20):
+    def compute():
+        check_metric(metric)
+        check_diversity_index(order_by)
+        districts = current_store().language_mix.diversity(None, metric, order_by, descending, num_districts)
+        return {"metric": metric, "order_by": order_by, "districts": districts}
+
+    return await cached_json(request, ("diversity", metric, order_by, descending, num_districts), compute)
+
+@app.get("/diversity/{state_name}")
+async def state_diversity(request: Request, state_name: str, metric: str = "Total P", order_by: str = "shannon",
+                          descending: bool = True):
+    def compute():
+        check_metric(metric)
+        check_diversity_index(order_by)
+        stem = current_store().state_stem(state_name)
+        if stem is None:
+            raise HTTPException(status_code=404, detail="State file not found")
+        districts = current_store().language_mix.diversity(stem, metric, order_by, descending)
+        return {"state": state_name, "metric": metric, "order_by": order_by, "districts": districts}
+
+    return await cached_json(request, ("diversity", state_name, metric, order_by, descending), compute)
+
+@app.get("/similar_districts/{state_name}/{district_name}")
+async def similar_districts(request: Request, state_name: str, district_name: str, metric: str = "Total P",
+                            num_districts: int = 10, same_state: bool = False):
+    def compute():
+        check_metric(metric)
+        stem = current_store().state_stem(state_name)
+        if stem is None:
+            raise HTTPException(status_code=404, detail="State file not found")
+        district_code = int(get_district_code(state_name, district_name))
+        districts = current_store().language_mix.similar(stem, district_code, metric, num_districts, same_state)
+        if districts is None:
+            raise HTTPException(status_code=404, detail="District not found in census file")
+        return {"state": state_name, "district": district_name, "metric": metric, "similar_districts": districts}
+
+    return await cached_json(
+        request, ("similar_districts", state_name, district_name, metric, num_districts, same_state), compute
+    )
+
+class AggregateQueryModel(BaseModel):
+    states: Optional[List[str]] = None
+    districts: Optional[List[str]] = None
+    towns: Optional[List[str]] = None
+    languages: Optional[List[str]] = None
+    area: str = "Total"
+    metrics: List[str] = ["P"]
+    language_level: str = "group"
+    group_by: List[str] = []
+    shares: bool = False
+    order_by: Optional[str] = None
+    descending: bool = True
+    top: Optional[int] = None
+    limit: Optional[int] = None
+
+def aggregate_query(request: AggregateQueryModel) -> dict:
+    store = current_store()
 
-        df_filtered['Mother tongue name'] = df_filtered['Mother tongue name'].str.strip().str.replace(r'^\d+\s*', '', regex=True).str.strip().str.lower()
+    try:
+        plan = QueryPlan.build(store, **request.model_dump())
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        print("Mother tongue names and Totals before grouping:")
-        print(df_filtered[['Mother tongue name', 'Urban P']])
+    with stage("query.execute"):
+        return plan.execute(store)
 
-        df_grouped = df_filtered[['Mother tongue name', 'Urban P']].groupby('Mother tongue name').sum().reset_index()
+@app.post("/query")
+async def query(request: AggregateQueryModel):
+    return await dispatch("query", aggregate_query, request)
 
-        print("Dataframe after grouping by 'Mother tongue name':")
-        print(df_grouped.head())
+async def save_report(builder, num_languages: int, output_file_path: str, empty_detail: str) -> dict:
+    report_df, timings = await dispatch("report", builder, current_store(), num_languages, app.state.report_pool)
 
-        df_sorted = df_grouped.sort_values(by='Urban P', ascending=False)
+    if report_df.empty:
+        raise HTTPException(status_code=500, detail=empty_detail)
 
-        top_languages = df_sorted.head(num_languages).to_dict(orient='records')
+    await dispatch("write", reports.write_xlsx, report_df, output_file_path)
+    return timings
 
-        return {"state": state_name, "district": district_name, "top_languages": top_languages}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    
 @app.get("/generate_top_languages_report/")
 async def generate_top_languages_report():
     data_dir = "data"
     num_languages = 4
-    all_states_top_languages = []
 
     try:
-        for file_name in os.listdir(data_dir):
-            if file_name.endswith(".XLSX"):
-                state_name = file_name.replace("_", " ").replace(".XLSX", "")
-                file_path = os.path.join(data_dir, file_name)
-                
-                df = pd.read_excel(file_path, skiprows=3)
-                
-                df.columns = [
-                    "Table name", "State code", "District code", "Town code", "Area name",
-                    "Mother tongue code", "Mother tongue name", "Unnamed: 7", "Unnamed: 8",
-                    "Unnamed: 9", "Rural P", "Unnamed: 11", "Unnamed: 12",
-                    "Urban P", "Unnamed: 14", "Unnamed: 15"
-                ]
-
-                df.columns = df.columns.str.strip()
-                
-                df['District code'] = df['District code'].astype(str)
-                df_filtered = df[df['District code'] == '0.0']
-                
-                if 'Mother tongue name' not in df_filtered.columns or 'Urban P' not in df_filtered.columns:
-                    continue
-
-                df_filtered['Mother tongue name'] = df_filtered['Mother tongue name'].str.strip().str.replace(r'^\d+\s*', '', regex=True).str.strip().str.lower()
-
-               
-                df_filtered = df_filtered.sort_values(by='Urban P', ascending=False)
-                
-                df_reversed = df_filtered.iloc[::-1]
-
-                df_deduped_reversed = df_reversed.drop_duplicates(subset=['Mother tongue name'], keep='first')
-                
-                df_filtered = df_deduped_reversed.iloc[::-1]
-                
-                df_grouped = df_filtered[['Mother tongue name', 'Urban P']]
-                 
-                df_sorted = df_grouped.sort_values(by='Urban P', ascending=False)
-
-                top_languages = df_sorted.head(num_languages).to_dict(orient='records')
-
-                for lang in top_languages:
-                    all_states_top_languages.append({
-                        "State": state_name,
-                        "Mother tongue name": lang["Mother tongue name"],
-                        "Urban P": lang["Urban P"]
-                    })
-        
-        if not all_states_top_languages:
-            raise HTTPException(status_code=500, detail="No data found for any state")
-        
-        report_df = pd.DataFrame(all_states_top_languages)
         output_file_path = os.path.join(data_dir, "Top_3_Languages_Indian_States.xlsx")
-        report_df.to_excel(output_file_path, index=False)
-
-        return {"message": "Report generated successfully", "file_path": output_file_path}
+        timings = await save_report(
+            reports.top_languages_report, num_languages, output_file_path,
+            "No data found for any state"
+        )
+
+        return {"message": "Report generated successfully", "file_path": output_file_path, "state_timings": timings}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 @app.get("/generate_top_languages_report1/")
-async def generate_top_languages_report():
+async def generate_top_languages_report1():
     data_dir = "data"
     num_languages = 4
-    all_states_top_languages = []
 
     try:
-        for file_name in os.listdir(data_dir):
-            if file_name.endswith(".XLSX"):
-                state_name = file_name.replace("_", " ").replace(".XLSX", "")
-                file_path = os.path.join(data_dir, file_name)
-                
-                df = pd.read_excel(file_path, skiprows=3)
-                
-                df.columns = [
-                    "Table name", "State code", "District code", "Town code", "Area name",
-                    "Mother tongue code", "Mother tongue name", "Unnamed: 7", "Unnamed: 8",
-                    "Unnamed: 9", "Rural P", "Unnamed: 11", "Unnamed: 12",
-                    "Urban P", "Unnamed: 14", "Unnamed: 15"
-                ]
-
-                df.columns = df.columns.str.strip()
-                
-                df['District code'] = df['District code'].astype(str)
-                df_filtered = df[df['District code'] == '0.0']
-                
-                if 'Mother tongue name' not in df_filtered.columns or 'Urban P' not in df_filtered.columns:
-                    continue
-
-                df_filtered['Mother tongue name'] = df_filtered['Mother tongue name'].str.strip().str.replace(r'^\d+\s*', '', regex=True).str.strip().str.lower()
-
-                df_filtered = df_filtered.sort_values(by='Urban P', ascending=False)
-                df_reversed = df_filtered.iloc[::-1]
-                df_deduped_reversed = df_reversed.drop_duplicates(subset=['Mother tongue name'], keep='first')
-                df_filtered = df_deduped_reversed.iloc[::-1]
-                
-                df_grouped = df_filtered[['Mother tongue name', 'Urban P']]
-                df_sorted = df_grouped.sort_values(by='Urban P', ascending=False)
-                top_languages = df_sorted.head(num_languages).to_dict(orient='records')
-
-                state_data = {"State": state_name}
-                total_speakers = 0
-
-                for lang in top_languages:
-                    state_data[lang["Mother tongue name"]] = lang["Urban P"]
-                    total_speakers += lang["Urban P"]
-
-                state_data["Total"] = total_speakers
-                all_states_top_languages.append(state_data)
-
-                # Adding percentage row for the state
-                percentage_data = {"State": state_name + " (Percentage)"}
-                for lang in top_languages:
-                    percentage_data[lang["Mother tongue name"]] = f"{(lang['Urban P'] / total_speakers) * 100:.2f}%"
-
-                all_states_top_languages.append(percentage_data)
-        
-        if not all_states_top_languages:
-            raise HTTPException(status_code=500, detail="No data found for any state")
-        
-        report_df = pd.DataFrame(all_states_top_languages)
-
-        # Rearrange columns to ensure "Total" is the last column
-        cols = [col for col in report_df.columns if col != "Total"] + ["Total"]
-        report_df = report_df[cols]
-
         output_file_path = os.path.join(data_dir, "Top_4_Languages_Indian_States.xlsx")
-        report_df.to_excel(output_file_path, index=False)
-
-        return {"message": "Report generated successfully", "file_path": output_file_path}
+        timings = await save_report(
+            reports.top_languages_share_report, num_languages, output_file_path,
+            "No data found for any state"
+        )
+
+        return {"message": "Report generated successfully", "file_path": output_file_path, "state_timings": timings}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -305,97 +472,111 @@ async def generate_top_languages_report():
 async def generate_town_languages_report():
     data_dir = "data"
     num_languages = 4
-    all_towns_top_languages = []
-
-    def keep_second_occurrence(df, subset):
-        df['occurrence'] = df.groupby(subset).cumcount() + 1
-        second_occurrence_df = df[df['occurrence'] == 2].drop(columns=['occurrence'])
-        return second_occurrence_df
-
-    def clean_town_name(name):
-        if isinstance(name, str):
-            return name.split(' (')[0].strip().lower()
-        return name
 
     try:
-        pincode_df = pd.read_csv(os.path.join(data_dir, "Updated_Pincode.csv"))
-        pincode_df['Office Name'] = pincode_df['Office Name'].apply(clean_town_name)
-        pincode_map = pincode_df.groupby('Office Name')['Pincode'].apply(list).to_dict()
-
-        for file_name in os.listdir(data_dir):
-            if file_name.endswith(".XLSX"):
-                state_name = file_name.replace("_", " ").replace(".XLSX", "")
-                file_path = os.path.join(data_dir, file_name)
-
-                df = pd.read_excel(file_path, skiprows=3)
-
-                df.columns = [
-                    "Table name", "State code", "District code", "Town code", "Area name",
-                    "Mother tongue code", "Mother tongue name", "Total P", "Total M", "Total F",
-                    "Rural P", "Rural M", "Rural F",
-                    "Urban P", "Urban M", "Urban F"
-                ]
+        if current_store().pincodes is None:
+            raise HTTPException(status_code=404, detail="Pincode file not found")
 
-                df.columns = df.columns.str.strip()
-
-                df['District code'] = pd.to_numeric(df['District code'], errors='coerce')
-                df['Town code'] = pd.to_numeric(df['Town code'], errors='coerce')
-                df_filtered = df[df['District code'] != 0]
-
-                if 'Mother tongue name' not in df_filtered.columns or 'Total P' not in df_filtered.columns:
-                    continue
-
-                df_filtered['Mother tongue name'] = df_filtered['Mother tongue name'].str.strip().str.replace(r'^\d+\s*', '', regex=True).str.strip().str.lower()
+        output_file_path = os.path.join(data_dir, "Top_4_Languages_Indian_Towns_with_Pincode.xlsx")
+        timings = await save_report(
+            reports.town_languages_report, num_languages, output_file_path,
+            "No data found for any town"
+        )
+
+        return {"message": "Report generated successfully", "file_path": output_file_path, "state_timings": timings}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-                df_filtered = keep_second_occurrence(df_filtered, ['Mother tongue name', 'District code', 'Town code'])
 
-                grouped_by_district = df_filtered.groupby('District code')
+class ReportJobRequestModel(BaseModel):
+    num_languages: int = 4
 
-                for district_code, district_df in grouped_by_district:
-                    # Find the District Name (Area name where Town code is 0.0)
-                    district_name = district_df[district_df['Town code'] == 0.0]['Area name'].values[0] if not district_df[district_df['Town code'] == 0.0].empty else None
 
-                    # Group by Town code within the district
-                    grouped_by_town = district_df.groupby(['Town code', 'Area name'])
+@app.post("/reports/{report_name}", status_code=202)
+async def enqueue_report(report_name: str, request: ReportJobRequestModel):
+    if report_name not in reports.REPORTS:
+        raise HTTPException(status_code=404, detail=f"Unknown report '{report_name}', expected one of {list(reports.REPORTS)}")
 
-                    for (town_code, town_name), town_df in grouped_by_town:
-                        # Find the top languages within the town
-                        town_grouped = town_df.groupby('Mother tongue name').agg({
-                            'Total P': 'sum',
-                            'Total M': 'sum',
-                            'Total F': 'sum'
-                        }).reset_index()
+    job = app.state.jobs.submit(report_name, {"num_languages": request.num_languages}, current_store())
+    return job.to_dict()
 
-                        sorted_town_grouped = town_grouped.sort_values(by='Total P', ascending=False)
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = app.state.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
 
-                        top_languages = sorted_town_grouped.head(num_languages)
+@app.get("/jobs/{job_id}/artifact")
+async def job_artifact(job_id: str):
+    job = app.state.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
 
-                        cleaned_town_name = clean_town_name(town_name)
-                        pincodes = pincode_map.get(cleaned_town_name, [])
+    return FileResponse(
+        job.artifact_path,
+        filename=app.state.jobs.download_name(job),
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
 
-                        for _, row in top_languages.iterrows():
-                            all_towns_top_languages.append({
-                                "State": state_name,
-                                "District Name": district_name,
-                                "Town": town_name,
-                                "Language": row['Mother tongue name'],
-                                "Total Population": row['Total P'],
-                                "Male Population": row['Total M'],
-                                "Female Population": row['Total F'],
-                                "Pincode": pincodes
-                            })
 
-        if not all_towns_top_languages:
-            raise HTTPException(status_code=500, detail="No data found for any town")
+@app.get("/reports/{report_name}/export")
+async def export_report(report_name: str, fmt: str = Query("xlsx", alias="format"), num_languages: int = 4):
+    if report_name not in reports.REPORTS:
+        raise HTTPException(status_code=404, detail=f"Unknown report '{report_name}', expected one of {list(reports.REPORTS)}")
+    if fmt not in export.FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format '{fmt}', expected one of {list(export.FORMATS)}")
 
-        report_df = pd.DataFrame(all_towns_top_languages)
+    _, iter_report, file_name = reports.REPORTS[report_name]
+    try:
+        frames = iter_report(current_store(), num_languages, app.state.report_pool)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    media_type, extension = export.FORMATS[fmt]
+    file_name = os.path.splitext(file_name)[0] + extension
+    headers = {"Content-Disposition": f'attachment; filename="{file_name}"'}
+
+    if fmt == "xlsx":
+        # No byte of an XLSX can be sent before the last row is written, so build the
+        # rows in the export lane and leave openpyxl to the write process. Unlike CSV
+        # and Parquet this holds the whole report in memory, and pickles it once
+        # more to hand it to the worker.
+        frames = await dispatch("export", list, frames)
+        if not frames:
+            raise HTTPException(status_code=404, detail="No data found for any state")
+        fd, output_file_path = tempfile.mkstemp(suffix=extension)
+        os.close(fd)
+        try:
+            await dispatch("write", export.save_xlsx, frames, output_file_path)
+        except BaseException:
+            os.remove(output_file_path)
+            raise
+        return FileResponse(output_file_path, media_type=media_type, headers=headers,
+                            background=BackgroundTask(os.remove, output_file_path))
+
+    # Rows are encoded state by state as the report engine produces them, on the export lane's threads.
+    # The first chunk is produced before the response starts: a report without rows has no
+    # header or schema to write, and answers 404 rather than an empty (invalid) file
+    chunks = app.state.dispatcher.stream("export", export.stream_frames(frames, fmt))
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        raise HTTPException(status_code=404, detail="No data found for any state")
 
-        output_file_path = os.path.join(data_dir, "Top_4_Languages_Indian_Towns_with_Pincode.xlsx")
-        report_df.to_excel(output_file_path, index=False)
+    async def body():
+        try:
+            yield first
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
 
-        return {"message": "Report generated successfully", "file_path": output_file_path}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return StreamingResponse(body(), media_type=media_type, headers=headers)
 
 
 class LanguageRequestModel(BaseModel):
@@ -403,105 +584,220 @@ class LanguageRequestModel(BaseModel):
     num_languages: int
 
 
-def process_file(file_path: str, num_languages: int):
-    try:
-        df = pd.read_excel(file_path, skiprows=5)
-        df.columns = df.columns.str.strip()  # Strip any extra spaces in column names
+def bilingual_top_languages_query(state_name: str, num_languages: int) -> dict:
+    store = current_store()
+    stem = store.bilingual_stem(state_name)
 
-        total_speakers_df = df.iloc[:, [1, 3, 4]].dropna()
-        total_speakers_df.columns = ['State name', 'Language', 'Persons']
+    if stem is None:
+        raise HTTPException(status_code=404, detail="File not found")
 
-        first_subsidiary_df = df.iloc[:, [8, 9]].dropna()
-        first_subsidiary_df.columns = ['Language', 'Persons']
+    total_speakers_top, first_subsidiary_top, second_subsidiary_top = reports.process_sheet(
+        store.bilingual_index, stem, num_languages
+    )
+    return {
+        "state": state_name,
+        "top_languages": total_speakers_top,
+        "top_first_subsidiary_languages": first_subsidiary_top,
+        "top_second_subsidiary_languages": second_subsidiary_top
+    }
 
-        second_subsidiary_df = df.iloc[:, [13, 14]].dropna()
-        second_subsidiary_df.columns = ['Language', 'Persons']
+@app.post("/top_languages/")
+async def top_languages(request: LanguageRequestModel):
+    return await dispatch("query", bilingual_top_languages_query, request.state_name, request.num_languages)
 
-        total_speakers_df['Language'] = total_speakers_df['Language'].str.lower()
-        first_subsidiary_df['Language'] = first_subsidiary_df['Language'].str.lower()
-        second_subsidiary_df['Language'] = second_subsidiary_df['Language'].str.lower()
+@app.get("/top_languages/")
+async def top_languages_get(request: Request, state_name: str, num_languages: int):
+    return await cached_json(
+        request,
+        ("top_languages", state_name, num_languages),
+        lambda: bilingual_top_languages_query(state_name, num_languages)
+    )
 
-        total_speakers_df = total_speakers_df.groupby('Language', as_index=False).agg({'Persons': 'max'})
-        first_subsidiary_df = first_subsidiary_df.groupby('Language', as_index=False).agg({'Persons': 'max'})
-        second_subsidiary_df = second_subsidiary_df.groupby('Language', as_index=False).agg({'Persons': 'max'})
+@app.get("/all_top_languages/")
+async def all_top_languages(num_languages: int):
+    folder_path = "data1"
 
-        total_speakers_top = total_speakers_df.sort_values(by='Persons', ascending=False).head(num_languages)
-        first_subsidiary_top = first_subsidiary_df.sort_values(by='Persons', ascending=False).head(num_languages)
-        second_subsidiary_top = second_subsidiary_df.sort_values(by='Persons', ascending=False).head(num_languages)
+    result_df, timings = await dispatch(
+        "report", reports.bilingual_report, current_store(), num_languages, app.state.report_pool
+    )
 
-        return total_speakers_top, first_subsidiary_top, second_subsidiary_top
-    except KeyError as e:
-        raise HTTPException(status_code=500, detail=f"Column error: {str(e)}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    output_file_path = os.path.join(folder_path, "All_State_Bilingual_Data.xlsx")
+    await dispatch("write", reports.write_xlsx, result_df, output_file_path)
 
-@app.post("/top_languages/")
-async def top_languages(request: LanguageRequestModel):
-    state_name = request.state_name
-    num_languages = request.num_languages
-    file_name = state_name.replace(" ", "_") + ".xlsx"
-    file_path = os.path.join("data1", file_name)
+    return {"detail": "Summary file created", "file_path": output_file_path, "state_timings": timings}
 
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="File not found")
 
-    try:
-        total_speakers_top, first_subsidiary_top, second_subsidiary_top = process_file(file_path, num_languages)
 
-        return {
-            "state": state_name,
-            "top_languages": total_speakers_top.to_dict(orient='records'),
-            "top_first_subsidiary_languages": first_subsidiary_top.to_dict(orient='records'),
-            "top_second_subsidiary_languages": second_subsidiary_top.to_dict(orient='records')
-        }
-    except HTTPException as e:
-        raise e
+@app.get("/bilingual/{state_name}/languages")
+async def bilingual_languages(request: Request, state_name: str, mother_tongue: Optional[str] = None,
+                              first_subsidiary: Optional[str] = None, metric: str = "Persons",
+                              num_languages: int = 10):
+    # Without mother_tongue: mother tongues of the state ("India" for the whole
+    # country); with it, the first subsidiary languages its speakers know; with
+    # both, the second subsidiary languages of that pair
+    def compute():
+        if metric not in PERSON_COLUMNS:
+            raise HTTPException(status_code=400, detail=f"Invalid metric. Choose from {PERSON_COLUMNS}")
+        if first_subsidiary is not None and mother_tongue is None:
+            raise HTTPException(status_code=400, detail="first_subsidiary requires mother_tongue")
 
-@app.get("/all_top_languages/")
-async def all_top_languages(num_languages: int):
-    folder_path = "data1"
-    result = []
-
-    for file_name in os.listdir(folder_path):
-        if file_name.endswith(".XLSX"):
-            file_path = os.path.join(folder_path, file_name)
-            state_name = file_name.replace("_", " ").replace(".XLSX", "")
-            try:
-                total_speakers_top, first_subsidiary_top, second_subsidiary_top = process_file(file_path, num_languages)
-                
-                for i in range(num_languages):
-                    row = [
-                        state_name,
-                        total_speakers_top.iloc[i]['Language'] if i < len(total_speakers_top) else '',
-                        total_speakers_top.iloc[i]['Persons'] if i < len(total_speakers_top) else '',
-                        first_subsidiary_top.iloc[i]['Language'] if i < len(first_subsidiary_top) else '',
-                        first_subsidiary_top.iloc[i]['Persons'] if i < len(first_subsidiary_top) else '',
-                        second_subsidiary_top.iloc[i]['Language'] if i < len(second_subsidiary_top) else '',
-                        second_subsidiary_top.iloc[i]['Persons'] if i < len(second_subsidiary_top) else ''
-                    ]
-                    result.append(row)
-            except HTTPException as e:
-                continue
-
-    result_df = pd.DataFrame(result, columns=[
-        'State name', 'Top language', 'Number of speakers', 
-        'Top first subsidiary language', 'Number of speakers (first subsidiary)',
-        'Top second subsidiary language', 'Number of speakers (second subsidiary)'
-    ])
-
-    result_df = result_df.groupby(['State name', 'Top language'], as_index=False).agg({
-        'Number of speakers': 'max',
-        'Top first subsidiary language': 'first',
-        'Number of speakers (first subsidiary)': 'first',
-        'Top second subsidiary language': 'first',
-        'Number of speakers (second subsidiary)': 'first'
-    })
+        stem = current_store().bilingual_stem(state_name)
+        if stem is None:
+            raise HTTPException(status_code=404, detail="State not found")
 
-    output_file_path = os.path.join(folder_path, "All_State_Bilingual_Data.xlsx")
-    result_df.to_excel(output_file_path, index=False)
+        mother = mother_tongue.strip().lower() if mother_tongue is not None else None
+        first = first_subsidiary.strip().lower() if first_subsidiary is not None else None
+        languages = current_store().bilingual_index.languages(stem, mother, first, metric, num_languages)
+        if languages is None:
+            raise HTTPException(status_code=404, detail="Language not found")
 
-    return {"detail": "Summary file created", "file_path": output_file_path}
+        return {
+            "state": state_name,
+            "mother_tongue": mother,
+            "first_subsidiary": first,
+            "metric": metric,
+            "languages": languages
+        }
 
+    return await cached_json(
+        request,
+        ("bilingual_languages", state_name, mother_tongue, first_subsidiary, metric, num_languages),
+        compute
+    )
+
+@app.get("/subsidiary_speakers/{language}")
+async def subsidiary_speakers(request: Request, language: str, level: str = "Any subsidiary", num_states: int = 10):
+    # States ranked by how many people speak ``language`` as a subsidiary language
+    def compute():
+        if level not in SUBSIDIARY_LEVELS:
+            raise HTTPException(status_code=400, detail=f"Invalid level. Choose from {SUBSIDIARY_LEVELS}")
+
+        index = current_store().bilingual_index
+        name = language.strip().lower()
+        states = index.states_speaking(name, level, num_states)
+        if states is None:
+            raise HTTPException(status_code=404, detail="Language not found")
+
+        return {"language": name, "level": level, "india": index.national(name), "states": states}
+
+    return await cached_json(request, ("subsidiary_speakers", language, level, num_states), compute)
+
+
+# Typeahead never needs more than a screenful
+MAX_SEARCH_RESULTS = 50
+
+@app.get("/search")
+async def search(request: Request, q: str, limit: int = 10, kind: Optional[List[str]] = Query(None)):
+    # Prefix matches first, then typo-tolerant ones, each ranked by population
+    def compute():
+        if not 0 < limit <= MAX_SEARCH_RESULTS:
+            raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_SEARCH_RESULTS}")
+        invalid = [k for k in kind or [] if k not in SEARCH_KINDS]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Invalid kind {invalid}. Choose from {SEARCH_KINDS}")
+        return {"query": q, "results": current_store().search_index.search(q, limit, kind)}
+
+    return await cached_json(request, ("search", q, limit, tuple(sorted(kind or []))), compute)
+
+
+def require_pincodes():
+    store = current_store()
+    if store.pincodes is None:
+        raise HTTPException(status_code=404, detail="Pincode file not found")
+    return store
+
+@app.get("/pincode/{pincode}/languages")
+async def pincode_languages(request: Request, pincode: int, metric: str = "Total P", num_languages: int = 10):
+    # Every census town the pincode's post offices are named after, with its top languages
+    def compute():
+        check_metric(metric)
+        store = require_pincodes()
+        towns = store.pincode_index.towns(pincode)
+        if not towns:
+            raise HTTPException(status_code=404, detail="Pincode not found")
+
+        results = []
+        for town in towns:
+            rankings = store.state_rankings(town["state"])
+            key = (town["district_code"], town["town_code"])
+            results.append({**town, "top_languages": rankings.town.top(key, metric, num_languages) or []})
+        return {"pincode": pincode, "metric": metric, "towns": results}
+
+    return await cached_json(request, ("pincode_languages", pincode, metric, num_languages), compute)
+
+@app.get("/town/{town_name}/pincodes")
+async def town_pincodes(request: Request, town_name: str, state_name: Optional[str] = None):
+    def compute():
+        store = require_pincodes()
+        stem = None
+        if state_name is not None:
+            stem = store.state_stem(state_name)
+            if stem is None:
+                raise HTTPException(status_code=404, detail="State not found")
+
+        towns = store.pincode_index.pincodes(town_name, stem)
+        if not towns:
+            raise HTTPException(status_code=404, detail="Town not found")
+        return {"town": town_name, "towns": towns}
+
+    return await cached_json(request, ("town_pincodes", town_name, state_name), compute)
+
+
+def current_map_redirect() -> RedirectResponse:
+    # The unversioned URL is revalidated every time; only the versioned one is cached
+    return RedirectResponse(
+        f"/map/{current_store().map_payload.version}", status_code=307, headers={"Cache-Control": "no-cache"}
+    )
+
+@app.get("/map")
+async def map_data():
+    return current_map_redirect()
+
+@app.get("/map/{version}")
+async def map_data_version(request: Request, version: str):
+    payload = current_store().map_payload
+    if version != payload.version:
+        # A link from before the last reload
+        return current_map_redirect()
+
+    body, encoding = payload.encode(request.headers.get("accept-encoding"))
+    # A strong validator names the exact bytes, so each content-coding gets its own
+    etag = f'"{payload.version}-{encoding}"' if encoding is not None else f'"{payload.version}"'
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
+
+@app.get("/admin/dataset")
+async def dataset_status():
+    # Current dataset version, per-file load times and recent reloads
+    store = current_store()
+    return {
+        **app.state.reloader.status(),
+        "load_seconds": {path: round(seconds, 4) for path, seconds in store.load_seconds.items()},
+    }
+
+# Token POST /admin/reload expects in X-Admin-Token; unset leaves the route disabled
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+@app.post("/admin/reload")
+async def reload_dataset(force: bool = False, x_admin_token: Optional[str] = Header(None)):
+    # The watcher already picks up changed sources; a manual (and above all a forced)
+    # reload re-reads workbooks in the API process, so any origin must not trigger it
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Manual reload is disabled; set ADMIN_TOKEN to enable it")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+    attempt = await dispatch("admin", app.state.reloader.reload, force)
+    if attempt is None:
+        return {"status": "unchanged", "version": app.state.store.version}
+    if attempt["status"] == "failed":
+        raise HTTPException(status_code=500, detail=attempt["error"])
+    return attempt
 
 
 # Run the FastAPI application
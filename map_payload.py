@@ -0,0 +1,84 @@
+import gzip
+import hashlib
+import json
+
+try:
+    import brotli
+except ImportError:
+    # Optional: without it the payload is served gzip-compressed only
+    brotli = None
+
+# State names used by react-datamaps-india in Frontend/src/MapChart.js
+MAP_STATES = [
+    "Andaman & Nicobar Island", "Andhra Pradesh", "Arunanchal Pradesh", "Assam", "Bihar", "Chandigarh",
+    "Chhattisgarh", "Dadra and Nagar Haveli", "Daman & Diu", "Delhi", "Goa", "Gujarat", "Haryana",
+    "Himachal Pradesh", "Jammu & Kashmir", "Jharkhand", "Karnataka", "Kerala", "Lakshadweep", "Madhya Pradesh",
+    "Maharashtra", "Manipur", "Meghalaya", "Mizoram", "Nagaland", "Odisha", "Puducherry", "Punjab",
+    "Rajasthan", "Sikkim", "Tamil Nadu", "Telangana", "Tripura", "Uttar Pradesh", "Uttarakhand", "West Bengal",
+]
+MAP_METRIC = "Total P"
+MAP_TOP_LANGUAGES = 3
+
+# Bump when the payload layout changes, so browsers holding the old one fetch the new URL
+MAP_PAYLOAD_FORMAT = 1
+
+
+def accepted_encodings(accept_encoding) -> set:
+    encodings = set()
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        encodings.add(name.strip().lower())
+    return encodings
+
+
+class MapPayload:
+    """Per-state figures for the choropleth, serialised and compressed once per store.
+
+    Keyed by the map's state names; states without a workbook (Telangana was
+    part of Andhra Pradesh in 2011) are left out and drawn as no data.
+    """
+
+    def __init__(self, version: str, body: bytes, encoded: dict):
+        self.version = version
+        self.body = body
+        # Content-Encoding -> compressed body
+        self.encoded = encoded
+
+    @classmethod
+    def build(cls, store) -> "MapPayload":
+        version = hashlib.sha256(f"{store.version};{MAP_PAYLOAD_FORMAT}".encode()).hexdigest()[:16]
+        states = {}
+        for map_name in MAP_STATES:
+            stem = store.state_stem(map_name)
+            if stem is None or 0 not in store.rollups.states[stem].totals:
+                continue
+            rollup = store.rollups.states[stem]
+            total, languages = rollup.shares(0, MAP_METRIC, MAP_TOP_LANGUAGES)
+            states[map_name] = {
+                "population": total,
+                "top_languages": [
+                    {"language": language["Mother tongue name"], "speakers": language[MAP_METRIC],
+                     "share": language["share"]}
+                    for language in languages
+                ],
+                "diversity": rollup.diversity(0, MAP_METRIC),
+            }
+
+        body = json.dumps(
+            {"version": version, "metric": MAP_METRIC, "states": states}, separators=(",", ":")
+        ).encode()
+        # mtime=0 keeps the gzip bytes identical for identical data
+        encoded = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            encoded["br"] = brotli.compress(body, quality=11)
+        return cls(version, body, encoded)
+
+    def encode(self, accept_encoding) -> tuple:
+        """The smallest body the client accepts and its Content-Encoding (None for identity)."""
+        accepted = accepted_encodings(accept_encoding)
+        candidates = [(body, encoding) for encoding, body in self.encoded.items() if encoding in accepted]
+        if not candidates:
+            return self.body, None
+        return min(candidates, key=lambda candidate: len(candidate[0]))
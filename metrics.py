@@ -0,0 +1,186 @@
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    # Not on Windows: the memory gauge then reports no peak
+    resource = None
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans a cached hover (sub-millisecond) up to a full town report
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names, values) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def samples(self):
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, names, values, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_label_text(names, values)} {_number(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        self._values = {}
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [("", self.labels, values, value) for values, value in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, *label_values, value):
+        with self._lock:
+            self._values[label_values] = value
+
+
+class CallbackGauge(Metric):
+    """Gauge (or counter) whose samples are read from live objects at scrape time."""
+
+    def __init__(self, name, help_text, labels, callback, kind="gauge"):
+        super().__init__(name, help_text, labels)
+        self.callback = callback
+        self.kind = kind
+
+    def samples(self):
+        return [("", self.labels, values, value) for values, value in sorted(self.callback().items())]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+
+    def observe(self, *label_values, value):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def samples(self):
+        with self._lock:
+            items = sorted((values, (list(counts), total)) for values, (counts, total) in self._series.items())
+
+        names = self.labels + ("le",)
+        samples = []
+        for values, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append(("_bucket", names, values + (_number(bound),), cumulative))
+            samples.append(("_sum", self.labels, values, total))
+            samples.append(("_count", self.labels, values, cumulative))
+        return samples
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "census_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+))
+REQUESTS = REGISTRY.register(Counter(
+    "census_requests_total", "HTTP requests by route template and status code", ("method", "route", "status")
+))
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "census_stage_duration_seconds", "Time spent in each pipeline stage", ("stage",)
+))
+SOURCE_LOAD_SECONDS = REGISTRY.register(Gauge(
+    "census_source_load_seconds", "Time to load each census source file at startup, parsed or from cache", ("file",)
+))
+RELOADS = REGISTRY.register(Counter(
+    "census_reloads_total", "Dataset reloads by outcome: swapped, unchanged (same content) or failed", ("result",)
+))
+ARTIFACT_CACHE = REGISTRY.register(Counter(
+    "census_artifact_cache_requests_total", "Report job submissions by artifact cache outcome", ("result",)
+))
+
+
+def process_memory() -> dict:
+    memory = {}
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+        memory[("peak",)] = peak
+    try:
+        with open("/proc/self/statm") as f:
+            memory[("resident",)] = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    return memory
+
+
+REGISTRY.register(CallbackGauge(
+    "census_process_memory_bytes", "Resident set size of the API process", ("kind",), process_memory
+))
+
+
+@contextmanager
+def stage(name: str, timings: dict = None):
+    """Time a pipeline stage into census_stage_duration_seconds (and ``timings`` if given)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(name, value=elapsed)
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
@@ -0,0 +1,115 @@
+import pandas as pd
+
+from census_schema import state_key, state_name
+
+# Post office suffixes in the India Post directory ("Panaji S.O", "Mumbai G.P.O.")
+OFFICE_SUFFIX = r"\s+(?:[sbhp]\.?\s?o|g\.?\s?p\.?\s?o)\.?$"
+
+# Directory state names the census workbooks (2011) know under another name;
+# Telangana's towns are still in the Andhra Pradesh workbook
+DIRECTORY_STATES = {
+    "chattisgarh": "chhattisgarh",
+    "pondicherry": "puducherry",
+    "telangana": "andhra pradesh",
+}
+
+
+def town_keys(names: pd.Series) -> pd.Series:
+    """Normalise census town names and post office names onto one join key.
+
+    Drops the civic status in brackets ("Panaji (M Corp. + OG)") and the post
+    office type ("Panaji S.O"); both sides then read "panaji".
+    """
+    names = names.astype("string").str.split(" (", regex=False).str[0].str.strip().str.lower()
+    return names.str.replace(OFFICE_SUFFIX, "", regex=True).str.strip()
+
+
+class PincodeIndex:
+    """Census town <-> pincode join, keyed by (state, town) so same-named towns in different states stay apart.
+
+    Built once from the post office directory and the C-16 town rows. Without
+    a state column in the directory the join falls back to the town name alone.
+    """
+
+    def __init__(self, state_towns: dict, pincode_towns: dict, town_names: dict):
+        # workbook stem -> {town key: [pincode, ...]}, what the town report joins on
+        self.state_towns = state_towns
+        # pincode -> [{state, district_code, town_code, town}, ...]
+        self.pincode_towns = pincode_towns
+        # town key -> [(workbook stem, display name), ...]
+        self.town_names = town_names
+
+    @classmethod
+    def build(cls, pincodes, mother_tongue: dict) -> "PincodeIndex":
+        towns = []
+        for stem, df in mother_tongue.items():
+            rows = df[df['Town code'] != 0].drop_duplicates(subset=['District code', 'Town code'])
+            towns.append(pd.DataFrame({
+                "stem": stem,
+                "district_code": rows['District code'].astype("int64").to_numpy(),
+                "town_code": rows['Town code'].astype("int64").to_numpy(),
+                "town": rows['Area name'].astype(str).to_numpy(),
+            }))
+        towns = pd.concat(towns, ignore_index=True) if towns else pd.DataFrame(
+            columns=["stem", "district_code", "town_code", "town"]
+        )
+        towns["key"] = town_keys(towns["town"]).to_numpy(dtype=object)
+
+        town_names = {}
+        for key, stem, town in zip(towns["key"], towns["stem"], towns["town"]):
+            town_names.setdefault(key, []).append((stem, town))
+
+        if pincodes is None:
+            return cls({stem: {} for stem in mother_tongue}, {}, town_names)
+
+        directory = pincodes.dropna(subset=['Office Name', 'Pincode'])
+        offices = pd.DataFrame({
+            "key": town_keys(directory['Office Name']).to_numpy(dtype=object),
+            "pincode": directory['Pincode'].astype("int64").to_numpy(),
+        })
+
+        if "StateName" in directory.columns:
+            # Resolve each distinct directory state to a workbook once
+            stems = {state_key(stem): stem for stem in mother_tongue}
+            resolved = {}
+            for name in directory['StateName'].dropna().unique():
+                key = state_key(name)
+                resolved[name] = stems.get(DIRECTORY_STATES.get(key, key))
+            offices["stem"] = directory['StateName'].map(resolved).to_numpy(dtype=object)
+            joined = towns.merge(offices, on=["stem", "key"], how="inner")
+        else:
+            joined = towns.merge(offices, on="key", how="inner")
+
+        state_towns = {stem: {} for stem in mother_tongue}
+        for stem, key, pincode in zip(joined["stem"], joined["key"], joined["pincode"]):
+            pins = state_towns[stem].setdefault(key, [])
+            if pincode not in pins:
+                pins.append(int(pincode))
+
+        pincode_towns = {}
+        matched = joined.drop_duplicates(subset=["pincode", "stem", "district_code", "town_code"])
+        for row in matched.itertuples(index=False):
+            pincode_towns.setdefault(int(row.pincode), []).append({
+                "state": state_name(row.stem),
+                "district_code": int(row.district_code),
+                "town_code": int(row.town_code),
+                "town": row.town,
+            })
+
+        return cls(state_towns, pincode_towns, town_names)
+
+    def towns(self, pincode: int):
+        return self.pincode_towns.get(pincode, [])
+
+    def pincodes(self, town_name: str, state_stem: str = None):
+        key = town_keys(pd.Series([town_name])).iloc[0]
+        matches = []
+        for stem, town in self.town_names.get(key, []):
+            if state_stem is not None and stem != state_stem:
+                continue
+            matches.append({
+                "state": state_name(stem),
+                "town": town,
+                "pincodes": self.state_towns.get(stem, {}).get(key, []),
+            })
+        return matches
@@ -0,0 +1,280 @@
+import numpy as np
+import pandas as pd
+
+from census_schema import state_name
+from pincodes import town_keys
+from rollups import GROUP_CODE_STEP
+
+DIMENSIONS = ["state", "district", "town", "language"]
+AREAS = ["Total", "Rural", "Urban"]
+SEXES = ["P", "M", "F"]
+# "group" rows ("6 HINDI") partition the population; "mother_tongue" rows are their members
+LANGUAGE_LEVELS = ["group", "mother_tongue"]
+
+# Result rows returned when a query sets no limit of its own
+MAX_QUERY_ROWS = 10000
+
+
+def _names(values) -> list:
+    # Query values are matched case- and space-insensitively
+    return sorted({str(value).strip().lower() for value in values})
+
+
+class QueryPlan:
+    """One aggregation over the C-16 frames of a store, with every name resolved to codes.
+
+    Execution only compares integer columns. A state filter prunes whole
+    frames. District, town and language filters become masks over the code
+    columns; languages are matched by the category codes every frame shares.
+    Count columns are gathered for matching rows only. The plan scans the
+    finest geographic level that its filters or group-by need. Coarser
+    levels are pre-summed rows in the workbooks, so nothing is counted twice.
+
+    Shares and ``top`` are relative to the parent of each result row: the
+    group-by dimensions before the last one. Share denominators ignore the
+    language filter, so "hindi" in a district is a share of the district.
+    """
+
+    def __init__(self, stems: list, districts: dict, towns: dict, languages, level: str,
+                 language_level: str, columns: list, group_by: list, shares: bool,
+                 order_by: str, descending: bool, top, limit: int):
+        self.stems = stems
+        # stem -> codes to keep, or None for no filter on that column
+        self.districts = districts
+        self.towns = towns
+        # Category codes of 'Mother tongue name', or None
+        self.languages = languages
+        self.level = level
+        self.language_level = language_level
+        self.columns = columns
+        self.group_by = group_by
+        self.shares = shares
+        self.order_by = order_by
+        self.descending = descending
+        self.top = top
+        self.limit = limit
+
+    @property
+    def parent(self) -> list:
+        return self.group_by[:-1]
+
+    @classmethod
+    def build(cls, store, states=None, districts=None, towns=None, languages=None, area: str = "Total",
+              metrics=("P",), language_level: str = "group", group_by=(), shares: bool = False,
+              order_by: str = None, descending: bool = True, top: int = None, limit: int = None) -> "QueryPlan":
+        """Validate a query against ``store``.
+
+        Raises ValueError for a malformed query and LookupError for a state,
+        district, town or language the store does not have.
+        """
+        group_by = list(group_by)
+        unknown = [dimension for dimension in group_by if dimension not in DIMENSIONS]
+        if unknown or len(set(group_by)) != len(group_by):
+            raise ValueError(f"group_by takes distinct dimensions from {DIMENSIONS}, got {group_by}")
+
+        area = area.strip().capitalize()
+        if area not in AREAS:
+            raise ValueError(f"Unknown area '{area}', expected one of {AREAS}")
+        metrics = [metric.strip().upper() for metric in metrics]
+        if not metrics or any(metric not in SEXES for metric in metrics):
+            raise ValueError(f"metrics takes one or more of {SEXES}, got {metrics}")
+        columns = [f"{area} {metric}" for metric in dict.fromkeys(metrics)]
+
+        if language_level not in LANGUAGE_LEVELS:
+            raise ValueError(f"Unknown language_level '{language_level}', expected one of {LANGUAGE_LEVELS}")
+
+        outputs = group_by + columns + ([f"{column} share" for column in columns] if shares else [])
+        if order_by is None:
+            order_by = columns[0]
+        elif order_by not in outputs:
+            raise ValueError(f"Cannot order by '{order_by}', expected one of {outputs}")
+
+        for name, value in (("top", top), ("limit", limit)):
+            if value is not None and value < 1:
+                raise ValueError(f"{name} must be at least 1")
+        limit = min(limit or MAX_QUERY_ROWS, MAX_QUERY_ROWS)
+
+        if states is None:
+            stems = list(store.mother_tongue)
+        else:
+            stems = []
+            for state in states:
+                stem = store.state_stem(state)
+                if stem is None:
+                    raise LookupError(f"State '{state}' not found")
+                if stem not in stems:
+                    stems.append(stem)
+
+        if (districts is not None or towns is not None) and states is None:
+            raise ValueError("District and town filters need a states filter")
+
+        district_codes = None
+        if districts is not None:
+            district_codes = {}
+            for district in districts:
+                found = False
+                for stem in stems:
+                    code = store.districts.lookup(stem, district)
+                    if code is not None and code in store.rollups.states[stem].totals:
+                        district_codes.setdefault(stem, set()).add(code)
+                        found = True
+                if not found:
+                    raise LookupError(f"District '{district}' not found")
+            district_codes = {stem: np.array(sorted(district_codes.get(stem, ()))) for stem in stems}
+
+        town_codes = None
+        if towns is not None:
+            wanted = set(town_keys(pd.Series(_names(towns))))
+            town_codes = {}
+            for stem in stems:
+                df = store.mother_tongue[stem]
+                rows = df[df['Town code'] != 0].drop_duplicates(subset=['Town code'])
+                matched = town_keys(rows['Area name']).isin(wanted).to_numpy()
+                town_codes[stem] = np.unique(rows['Town code'].to_numpy()[matched])
+            if not any(len(codes) for codes in town_codes.values()):
+                raise LookupError(f"No town matching {sorted(wanted)} found")
+
+        language_codes = None
+        if languages is not None:
+            categories = pd.Index(cls._categories(store, 'Mother tongue name'))
+            wanted = _names(languages)
+            missing = [language for language in wanted if language not in categories]
+            if missing:
+                raise LookupError(f"Language {missing} not found")
+            language_codes = categories.get_indexer(wanted)
+
+        if towns is not None or "town" in group_by:
+            level = "town"
+        elif districts is not None or "district" in group_by:
+            level = "district"
+        else:
+            level = "state"
+
+        return cls(stems, district_codes, town_codes, language_codes, level, language_level, columns,
+                   group_by, shares, order_by, descending, top, limit)
+
+    def _scan(self, store) -> tuple:
+        # Rows of the planned level across the pruned frames, as parallel code and count arrays
+        names = ["state", "district", "town", "language", "area"] + self.columns
+        parts = {name: [] for name in names}
+        scanned = 0
+        for index, stem in enumerate(self.stems):
+            df = store.mother_tongue[stem]
+            scanned += len(df)
+            district = df['District code'].to_numpy()
+            town = df['Town code'].to_numpy()
+            group = df['Mother tongue code'].to_numpy() % GROUP_CODE_STEP == 0
+
+            if self.level == "state":
+                mask = district == 0
+            elif self.level == "district":
+                mask = (district != 0) & (town == 0)
+            else:
+                mask = town != 0
+            mask &= group if self.language_level == "group" else ~group
+            if self.districts is not None:
+                mask &= np.isin(district, self.districts[stem])
+            if self.towns is not None:
+                mask &= np.isin(town, self.towns[stem])
+
+            rows = np.flatnonzero(mask)
+            parts["state"].append(np.full(len(rows), index, dtype=np.int16))
+            parts["district"].append(district[rows])
+            parts["town"].append(town[rows])
+            parts["language"].append(df['Mother tongue name'].cat.codes.to_numpy()[rows])
+            parts["area"].append(df['Area name'].cat.codes.to_numpy()[rows])
+            for column in self.columns:
+                parts[column].append(df[column].to_numpy()[rows].astype(np.int64))
+
+        if not self.stems:
+            return pd.DataFrame(columns=names), scanned
+        return pd.DataFrame({name: np.concatenate(arrays) for name, arrays in parts.items()}), scanned
+
+    def _aggregate(self, rows: pd.DataFrame, keys: list) -> pd.DataFrame:
+        if keys:
+            return rows.groupby(keys, sort=False)[self.columns].sum().reset_index()
+        return rows[self.columns].sum().to_frame().T.reset_index(drop=True)
+
+    def _label(self, store, result: pd.DataFrame) -> pd.DataFrame:
+        labelled = {}
+        # District and town names repeat across states, so their rows carry the state too
+        if {"state", "district", "town"} & set(self.group_by):
+            labelled["state"] = np.array([state_name(stem) for stem in self.stems], dtype=object)[result["state"]]
+        if "district" in self.group_by:
+            names = {
+                (index, code): name
+                for index, stem in enumerate(self.stems)
+                for code, name in store.districts.names(stem).items()
+            }
+            labelled["district"] = [names.get(key) for key in zip(result["state"].astype(int), result["district"].astype(int))]
+            labelled["district_code"] = result["district"].astype("int64")
+        if "town" in self.group_by:
+            labelled["town"] = self._categories(store, 'Area name')[result["area"]]
+            labelled["town_code"] = result["town"].astype("int64")
+        if "language" in self.group_by:
+            labelled["language"] = self._categories(store, 'Mother tongue name')[result["language"]]
+        for column in result.columns:
+            if column in self.columns or column.endswith(" share"):
+                labelled[column] = result[column]
+        return pd.DataFrame(labelled, index=result.index)
+
+    @staticmethod
+    def _categories(store, column: str) -> np.ndarray:
+        # Every frame shares the categories of its name columns
+        for df in store.mother_tongue.values():
+            return np.asarray(df[column].cat.categories, dtype=object)
+        return np.array([], dtype=object)
+
+    def execute(self, store) -> dict:
+        rows, scanned = self._scan(store)
+        matched = rows if self.languages is None else rows[np.isin(rows["language"].to_numpy(), self.languages)]
+
+        # Keys are codes throughout; a town's code is unique within its district
+        keys = {"state": ["state"], "district": ["state", "district"], "town": ["state", "district", "town"],
+                "language": ["language"]}
+        group_keys = list(dict.fromkeys(key for dimension in self.group_by for key in keys[dimension]))
+        parent_keys = list(dict.fromkeys(key for dimension in self.parent for key in keys[dimension]))
+        if "town" in self.group_by:
+            # Town labels come from the first row of each town
+            result = matched.groupby(group_keys, sort=False).agg(
+                {"area": "first", **{column: "sum" for column in self.columns}}
+            ).reset_index()
+        else:
+            result = self._aggregate(matched, group_keys)
+
+        if self.shares:
+            totals = self._aggregate(rows, parent_keys)
+            if parent_keys:
+                totals = result[parent_keys].merge(totals, on=parent_keys, how="left")
+            else:
+                totals = totals.loc[np.zeros(len(result), dtype=np.int64)].reset_index(drop=True)
+            for column in self.columns:
+                denominator = totals[column].to_numpy(dtype=np.float64)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    share = np.where(denominator > 0, result[column].to_numpy() / denominator * 100, 0.0)
+                result[f"{column} share"] = np.round(share, 2)
+
+        codes = result
+        result = self._label(store, result)
+        by = [self.order_by] + [dimension for dimension in self.group_by if dimension != self.order_by]
+        ascending = [not self.descending] + [True] * (len(by) - 1)
+        result = result.sort_values(by, ascending=ascending, kind="stable")
+        if self.top is not None and self.parent:
+            # Parents are told apart by their codes; same-named districts and towns stay separate
+            result = result.groupby([codes[key] for key in parent_keys], sort=False).head(self.top)
+        elif self.top is not None:
+            result = result.head(self.top)
+
+        truncated = len(result) > self.limit
+        return {
+            "plan": {
+                "states": len(self.stems),
+                "level": self.level,
+                "language_level": self.language_level,
+                "rows_scanned": scanned,
+                "rows_matched": len(matched),
+            },
+            "columns": list(result.columns),
+            "rows": result.head(self.limit).to_dict(orient="records"),
+            "truncated": truncated,
+        }
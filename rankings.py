@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+from census_schema import COUNT_COLUMNS
+
+
+class Ranking:
+    """Descending language ranking for every group of one aggregation level.
+
+    Rows are stored grouped by key; for each metric ``orders[m]`` holds the
+    row numbers of every group sorted by that metric, so top-N is a slice.
+    """
+
+    def __init__(self, keys: dict, offsets: np.ndarray, languages: np.ndarray,
+                 categories: np.ndarray, values: np.ndarray, orders: np.ndarray,
+                 label: str = 'Mother tongue name', metrics: list = COUNT_COLUMNS):
+        self.keys = keys
+        self.offsets = offsets
+        self.languages = languages
+        self.categories = categories
+        self.values = values
+        self.orders = orders
+        self.label = label
+        self.metrics = metrics
+
+    @classmethod
+    def build(cls, agg: pd.DataFrame, key_columns: list,
+              label: str = 'Mother tongue name', metrics: list = COUNT_COLUMNS) -> "Ranking":
+        # agg holds one row per (key, label) with every metric column
+        agg = agg.sort_values(key_columns, kind='stable').reset_index(drop=True)
+
+        if key_columns:
+            group_keys = agg[key_columns].drop_duplicates()
+            starts = group_keys.index.to_numpy()
+            if len(key_columns) == 1:
+                keys = group_keys[key_columns[0]].tolist()
+            else:
+                keys = list(group_keys.itertuples(index=False, name=None))
+        else:
+            starts = np.array([0]) if len(agg) else np.array([], dtype=np.int64)
+            keys = [None] if len(agg) else []
+
+        offsets = np.append(starts, len(agg)).astype(np.int64)
+        group_ids = np.repeat(np.arange(len(starts)), np.diff(offsets))
+
+        languages = pd.Categorical(agg[label])
+        values = agg[metrics].to_numpy(dtype=np.int64)
+        # State-level sums fit comfortably; halve the matrix whenever they do
+        if values.size == 0 or values.max() <= np.iinfo(np.int32).max:
+            values = values.astype(np.int32)
+
+        orders = np.empty((len(metrics), len(agg)), dtype=np.int32)
+        for m in range(len(metrics)):
+            # Stable: ties keep alphabetical language order within the group
+            orders[m] = np.lexsort((-values[:, m], group_ids))
+
+        return cls(
+            {key: i for i, key in enumerate(keys)},
+            offsets,
+            languages.codes.copy(),
+            np.asarray(languages.categories, dtype=object),
+            values,
+            orders,
+            label,
+            list(metrics),
+        )
+
+    def __contains__(self, key) -> bool:
+        return key in self.keys
+
+    def counts(self, key, metric: str):
+        # Every language count of one group, in stored (alphabetical) order
+        group = self.keys.get(key)
+        if group is None:
+            return None
+        return self.values[self.offsets[group]:self.offsets[group + 1], self.metrics.index(metric)]
+
+    def top(self, key, metric: str, num_languages: int):
+        group = self.keys.get(key)
+        if group is None:
+            return None
+        m = self.metrics.index(metric)
+        start, end = self.offsets[group], self.offsets[group + 1]
+        rows = self.orders[m][start:min(end, start + max(num_languages, 0))]
+        return [
+            {self.label: name, metric: int(value)}
+            for name, value in zip(self.categories[self.languages[rows]], self.values[rows, m])
+        ]
+
+
+class LanguageRankings:
+    """State, district and town language rankings for one C-16 workbook."""
+
+    def __init__(self, state: Ranking, district: Ranking, town: Ranking):
+        self.state = state
+        self.district = district
+        self.town = town
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "LanguageRankings":
+        state_rows = df[df['District code'] == 0]
+        district_rows = df[df['District code'] != 0]
+
+        # Group headings ("6 HINDI") normalise to the same name as their main
+        # mother tongue; the state and district rankings keep the smaller of the two rows
+        state_agg = state_rows.groupby('Mother tongue name', observed=True)[COUNT_COLUMNS].min().reset_index()
+
+        # Districts rank their own total rows (town code 0); the town rows are already counted in them
+        district_totals = district_rows[district_rows['Town code'] == 0]
+        district_agg = district_totals.groupby(
+            ['District code', 'Mother tongue name'], observed=True
+        )[COUNT_COLUMNS].min().reset_index()
+
+        # Towns rank their own rows the same way
+        town_rows = district_rows[district_rows['Town code'] != 0]
+        town_agg = town_rows.groupby(
+            ['District code', 'Town code', 'Mother tongue name'], observed=True
+        )[COUNT_COLUMNS].min().reset_index()
+
+        return cls(
+            Ranking.build(state_agg, []),
+            Ranking.build(district_agg, ['District code']),
+            Ranking.build(town_agg, ['District code', 'Town code']),
+        )
@@ -0,0 +1,101 @@
+import os
+import threading
+import time
+import traceback
+from collections import deque
+
+from census_cache import FrameCache
+from census_store import CensusStore, source_stats
+from metrics import RELOADS, stage
+
+# Seconds between checks of the source files; 0 disables the watcher thread
+RELOAD_INTERVAL = float(os.environ.get("RELOAD_INTERVAL", "10"))
+
+# Reload attempts kept for the admin endpoint
+RELOAD_HISTORY = 20
+
+
+class DataReloader:
+    """Watches the census sources and swaps in a new store when any of them changes.
+
+    Only changed workbooks are read again (through the Parquet cache); the
+    rest of the snapshot, and the derived tables of unchanged states, carry
+    over. The new store is built off to the side and published with a single
+    assignment, so requests holding the previous snapshot finish on it.
+    """
+
+    def __init__(self, get_store, publish, interval: float = RELOAD_INTERVAL):
+        self.get_store = get_store
+        self.publish = publish
+        self.interval = interval
+        self.history = deque(maxlen=RELOAD_HISTORY)
+        # One reload at a time, whether from the watcher or the admin endpoint
+        self._lock = threading.Lock()
+        # Stats of the sources the last failed attempt read; not retried until they change again
+        self._failed = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="census-reloader", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            self.reload()
+
+    def reload(self, force: bool = False) -> dict:
+        """Reload if any source changed and return the attempt.
+
+        ``force`` re-reads every source (through the Parquet cache) instead of
+        carrying unchanged ones over.
+        """
+        with self._lock:
+            store = self.get_store()
+            current = source_stats(*store.paths)
+            changed = store.changed_sources(current)
+            signature = {path: current.get(path) for path in changed}
+            if not force and (not changed or signature == self._failed):
+                return None
+
+            attempt = {"started_at": time.time(), "changed": changed, "previous_version": store.version}
+            start = time.perf_counter()
+            try:
+                with stage("reload"):
+                    cache = FrameCache()
+                    new_store = CensusStore.load(*store.paths, cache=cache, previous=None if force else store)
+            except Exception as e:
+                # Typically a workbook caught mid-copy; the next check retries it
+                RELOADS.inc("failed")
+                self._failed = signature
+                attempt.update(status="failed", error=str(e), traceback=traceback.format_exc(limit=5))
+            else:
+                self._failed = None
+                self.publish(new_store)
+                RELOADS.inc("swapped" if new_store.version != store.version else "unchanged")
+                attempt.update(
+                    status="swapped" if new_store.version != store.version else "unchanged",
+                    version=new_store.version,
+                    reread={path: round(seconds, 4) for path, seconds in new_store.load_seconds.items()},
+                )
+            attempt["seconds"] = round(time.perf_counter() - start, 4)
+            self.history.append(attempt)
+            return attempt
+
+    def status(self) -> dict:
+        store = self.get_store()
+        return {
+            "version": store.version,
+            "sources": len(store.sources),
+            "watching": self._thread is not None,
+            "interval_seconds": self.interval,
+            "last_reload": self.history[-1] if self.history else None,
+            "history": list(self.history),
+        }
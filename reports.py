@@ -0,0 +1,298 @@
+import os
+import time
+from concurrent.futures import as_completed
+import pandas as pd
+
+from census_schema import state_name
+from metrics import stage
+from pincodes import town_keys
+
+# Worker processes for multi-state reports; REPORT_WORKERS=1 runs them inline
+REPORT_WORKERS = int(os.environ.get("REPORT_WORKERS", "0")) or os.cpu_count() or 1
+
+
+def _timed(builder, stem, args):
+    start = time.perf_counter()
+    rows = builder(stem, *args)
+    return rows, time.perf_counter() - start
+
+
+def run_report(builder, tasks: dict, executor=None, progress=None):
+    """Run ``builder(stem, *args)`` for every state in ``tasks`` and merge the rows.
+
+    With an executor the states are fanned out across its workers; results are
+    merged in ``tasks`` order either way. ``progress(done, total)`` is called as
+    each state finishes. Returns the rows and per-state seconds.
+    """
+    stems = list(tasks)
+    results = {}
+
+    with stage(f"report.{builder.__name__}"):
+        if executor is None:
+            for stem in stems:
+                results[stem] = _timed(builder, stem, tasks[stem])
+                if progress is not None:
+                    progress(len(results), len(stems))
+        else:
+            futures = {executor.submit(_timed, builder, stem, tasks[stem]): stem for stem in stems}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                if progress is not None:
+                    progress(len(results), len(stems))
+
+    rows = []
+    frames = []
+    timings = {}
+    for stem in stems:
+        state_rows, seconds = results[stem]
+        # Builders return either a list of rows or a ready DataFrame
+        if isinstance(state_rows, pd.DataFrame):
+            frames.append(state_rows)
+        else:
+            rows.extend(state_rows)
+        timings[stem] = round(seconds, 4)
+
+    if frames:
+        with stage("report.concat"):
+            return pd.concat(frames, ignore_index=True), timings
+    return rows, timings
+
+
+def top_languages_rows(stem, rankings, num_languages):
+    return [
+        {"State": state_name(stem), "Mother tongue name": lang["Mother tongue name"], "Urban P": lang["Urban P"]}
+        for lang in rankings.state.top(None, 'Urban P', num_languages) or []
+    ]
+
+
+def top_languages_share_rows(stem, rankings, num_languages):
+    top_languages = rankings.state.top(None, 'Urban P', num_languages) or []
+
+    state_data = {"State": state_name(stem)}
+    total_speakers = 0
+
+    for lang in top_languages:
+        state_data[lang["Mother tongue name"]] = lang["Urban P"]
+        total_speakers += lang["Urban P"]
+
+    state_data["Total"] = total_speakers
+
+    # Adding percentage row for the state
+    percentage_data = {"State": state_name(stem) + " (Percentage)"}
+    for lang in top_languages:
+        percentage_data[lang["Mother tongue name"]] = f"{(lang['Urban P'] / total_speakers) * 100:.2f}%"
+
+    return [state_data, percentage_data]
+
+
+def keep_second_occurrence(df: pd.DataFrame, subset: list) -> pd.DataFrame:
+    # The legacy town report ranks the mother tongue row that follows its group heading
+    occurrence = df.groupby(subset, observed=True, sort=False).cumcount() + 1
+    return df[occurrence.to_numpy() == 2]
+
+
+def town_top_languages(df: pd.DataFrame, num_languages: int) -> pd.DataFrame:
+    """Top languages by Total P for every (district, town) of one C-16 frame.
+
+    Town code 0 is the district itself. One stable sort by (district, town,
+    Total P desc, language) and a grouped head replace the per-town groupby;
+    languages with equal counts are listed alphabetically.
+    """
+    district_rows = df[df['District code'] != 0]
+    towns = keep_second_occurrence(district_rows, ['Mother tongue name', 'District code', 'Town code'])
+
+    # The district name is the Area name of its town code 0 rows
+    district_totals = towns[towns['Town code'] == 0].drop_duplicates(subset=['District code'])
+    district_names = pd.Series(
+        district_totals['Area name'].astype(object).to_numpy(), index=district_totals['District code'].to_numpy()
+    )
+
+    ranked = towns.sort_values(
+        ['District code', 'Town code', 'Total P', 'Mother tongue name'],
+        ascending=[True, True, False, True],
+        kind='stable'
+    )
+    top = ranked.groupby(['District code', 'Town code'], sort=False).head(num_languages)
+
+    return pd.DataFrame({
+        "District code": top['District code'].to_numpy(),
+        "District Name": top['District code'].map(district_names).to_numpy(),
+        "Town": top['Area name'].astype(object).to_numpy(),
+        "Language": top['Mother tongue name'].astype(object).to_numpy(),
+        # Counts are stored as int32; the report keeps its int64 columns
+        "Total Population": top['Total P'].to_numpy(dtype="int64"),
+        "Male Population": top['Total M'].to_numpy(dtype="int64"),
+        "Female Population": top['Total F'].to_numpy(dtype="int64"),
+    })
+
+
+def town_pincodes(town_names: pd.Series, pincode_map: dict) -> list:
+    # Normalise each distinct town name once, then broadcast the lists back
+    codes, uniques = pd.factorize(town_names)
+    unique_pincodes = [pincode_map.get(key, []) for key in town_keys(pd.Series(uniques))]
+    return [unique_pincodes[code] for code in codes]
+
+
+def town_languages_rows(stem, df, pincode_map, num_languages):
+    # pincode_map is this state's slice of the store's PincodeIndex
+    top = town_top_languages(df, num_languages)
+    top.insert(0, "State", state_name(stem))
+    top["Pincode"] = town_pincodes(top["Town"], pincode_map)
+    return top.drop(columns=["District code"])
+
+
+def process_sheet(index, stem: str, num_languages: int):
+    """Top mother tongues, first and second subsidiary languages of one C-17 sheet.
+
+    Subsidiary languages are ranked by their largest single mother tongue group,
+    as this summary always has; Persons stay floats like the original sheets.
+    """
+    return tuple(
+        [{"Language": row["Language"], "Persons": float(row["Persons"])}
+         for row in ranking.top(stem, "Persons", num_languages) or []]
+        for ranking in (index.mother_tongues, index.first_largest, index.second_largest)
+    )
+
+
+def bilingual_rows(stem, index, num_languages):
+    total_speakers_top, first_subsidiary_top, second_subsidiary_top = process_sheet(index, stem, num_languages)
+
+    def cell(top, i, column):
+        return top[i][column] if i < len(top) else ''
+
+    rows = []
+    for i in range(num_languages):
+        rows.append([
+            state_name(stem),
+            cell(total_speakers_top, i, 'Language'),
+            cell(total_speakers_top, i, 'Persons'),
+            cell(first_subsidiary_top, i, 'Language'),
+            cell(first_subsidiary_top, i, 'Persons'),
+            cell(second_subsidiary_top, i, 'Language'),
+            cell(second_subsidiary_top, i, 'Persons')
+        ])
+    return rows
+
+
+def top_languages_report(store, num_languages: int = 4, executor=None, progress=None):
+    # A state's rows are a slice of its prebuilt ranking; sending the rankings
+    # (town arrays included) to the workers costs far more than that, so run inline
+    tasks = {stem: (rankings, num_languages) for stem, rankings in store.rankings.items()}
+    rows, timings = run_report(top_languages_rows, tasks, None, progress)
+    return pd.DataFrame(rows), timings
+
+
+def top_languages_share_report(store, num_languages: int = 4, executor=None, progress=None):
+    # Inline like top_languages_report
+    tasks = {stem: (rankings, num_languages) for stem, rankings in store.rankings.items()}
+    rows, timings = run_report(top_languages_share_rows, tasks, None, progress)
+    report_df = pd.DataFrame(rows)
+
+    # Rearrange columns to ensure "Total" is the last column
+    if not report_df.empty:
+        cols = [col for col in report_df.columns if col != "Total"] + ["Total"]
+        report_df = report_df[cols]
+    return report_df, timings
+
+
+def town_languages_report(store, num_languages: int = 4, executor=None, progress=None):
+    pincode_index = town_pincode_index(store)
+    tasks = {
+        stem: (df, pincode_index.state_towns.get(stem, {}), num_languages)
+        for stem, df in store.mother_tongue.items()
+    }
+    rows, timings = run_report(town_languages_rows, tasks, executor, progress)
+    return pd.DataFrame(rows), timings
+
+
+BILINGUAL_COLUMNS = [
+    'State name', 'Top language', 'Number of speakers',
+    'Top first subsidiary language', 'Number of speakers (first subsidiary)',
+    'Top second subsidiary language', 'Number of speakers (second subsidiary)'
+]
+
+
+def group_bilingual_rows(rows: list) -> pd.DataFrame:
+    result_df = pd.DataFrame(rows, columns=BILINGUAL_COLUMNS)
+
+    return result_df.groupby(['State name', 'Top language'], as_index=False).agg({
+        'Number of speakers': 'max',
+        'Top first subsidiary language': 'first',
+        'Number of speakers (first subsidiary)': 'first',
+        'Top second subsidiary language': 'first',
+        'Number of speakers (second subsidiary)': 'first'
+    })
+
+
+def bilingual_report(store, num_languages: int, executor=None, progress=None):
+    # Each state is a few slices of the prebuilt index, cheaper inline than
+    # pickling the index out to the report workers
+    tasks = {stem: (store.bilingual_index, num_languages) for stem in store.bilingual}
+    rows, timings = run_report(bilingual_rows, tasks, None, progress)
+    return group_bilingual_rows(rows), timings
+
+
+def write_xlsx(report_df: pd.DataFrame, file_path: str):
+    # openpyxl is pure Python; the endpoints run this in a separate process
+    report_df.to_excel(file_path, index=False)
+
+
+def iter_report(builder, tasks: dict, executor=None):
+    """Yield each state's rows as a DataFrame, in ``tasks`` order, as soon as it is built."""
+    stems = list(tasks)
+    if executor is None:
+        results = (_timed(builder, stem, tasks[stem]) for stem in stems)
+    else:
+        results = executor.map(_timed, [builder] * len(stems), stems, [tasks[stem] for stem in stems])
+
+    for state_rows, _ in results:
+        frame = state_rows if isinstance(state_rows, pd.DataFrame) else pd.DataFrame(state_rows)
+        if not frame.empty:
+            yield frame
+
+
+def iter_top_languages_report(store, num_languages: int = 4, executor=None):
+    tasks = {stem: (rankings, num_languages) for stem, rankings in store.rankings.items()}
+    return iter_report(top_languages_rows, tasks, None)
+
+
+def iter_top_languages_share_report(store, num_languages: int = 4, executor=None):
+    # One column per language across all states, so the header is only known at the end
+    report_df, _ = top_languages_share_report(store, num_languages, executor)
+    if not report_df.empty:
+        yield report_df
+
+
+def iter_town_languages_report(store, num_languages: int = 4, executor=None):
+    pincode_index = town_pincode_index(store)
+    tasks = {
+        stem: (df, pincode_index.state_towns.get(stem, {}), num_languages)
+        for stem, df in store.mother_tongue.items()
+    }
+    return iter_report(town_languages_rows, tasks, executor)
+
+
+def bilingual_state_rows(stem, index, num_languages):
+    # (State name, Top language) groups never span states, so each state is grouped on its own
+    rows = bilingual_rows(stem, index, num_languages)
+    return group_bilingual_rows(rows) if rows else []
+
+
+def iter_bilingual_report(store, num_languages: int, executor=None):
+    tasks = {stem: (store.bilingual_index, num_languages) for stem in store.bilingual}
+    return iter_report(bilingual_state_rows, tasks, None)
+
+
+def town_pincode_index(store):
+    if store.pincodes is None:
+        raise FileNotFoundError("Pincode file not found")
+    return store.pincode_index
+
+
+# report name -> (builder returning (DataFrame, timings), per-state DataFrame iterator, file name)
+REPORTS = {
+    "top_languages": (top_languages_report, iter_top_languages_report, "Top_3_Languages_Indian_States.xlsx"),
+    "top_languages_share": (top_languages_share_report, iter_top_languages_share_report, "Top_4_Languages_Indian_States.xlsx"),
+    "town_languages": (town_languages_report, iter_town_languages_report, "Top_4_Languages_Indian_Towns_with_Pincode.xlsx"),
+    "bilingual": (bilingual_report, iter_bilingual_report, "All_State_Bilingual_Data.xlsx"),
+}
@@ -0,0 +1,68 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# Serialised response bodies kept in memory; least recently used go first
+RESPONSE_CACHE_BYTES = int(os.environ.get("RESPONSE_CACHE_BYTES", 16 * 1024 * 1024))
+
+# Answers only change when the census files do; the ETag catches that on revalidation
+CACHE_CONTROL = "public, max-age=300"
+
+# Responses whose URL carries the dataset version never change
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def response_etag(dataset_version: str, key: tuple) -> str:
+    # Strong validator: same dataset and same query always serialise to the same bytes
+    payload = json.dumps([dataset_version, list(key)], default=str)
+    return '"' + hashlib.sha256(payload.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so a W/ prefix still matches
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class ResponseCache:
+    """Size-bounded LRU of serialised JSON bodies keyed by ETag."""
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._bodies = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag: str):
+        with self._lock:
+            body = self._bodies.get(etag)
+            if body is None:
+                self.misses += 1
+                return None
+            self._bodies.move_to_end(etag)
+            self.hits += 1
+            return body
+
+    def put(self, etag: str, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._bodies.pop(etag, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._bodies[etag] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._bodies.popitem(last=False)
+                self.size -= len(evicted)
+
+    def __len__(self) -> int:
+        return len(self._bodies)
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+from census_schema import COUNT_COLUMNS
+from rankings import Ranking
+
+# Mother tongue group headings ("6 HINDI") carry codes that are multiples of 1000;
+# every speaker belongs to exactly one group, so groups sum to the population
+GROUP_CODE_STEP = 1000
+
+
+def diversity_indices(counts: np.ndarray) -> tuple:
+    """Shares, Shannon entropy (natural log) and Herfindahl index of group counts along the last axis.
+
+    Rows without speakers get zero shares and zero for both indices.
+    """
+    totals = counts.sum(axis=-1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares = np.where(totals > 0, counts / totals, 0.0)
+        logs = np.where(shares > 0, np.log(shares), 0.0)
+    return shares, -(shares * logs).sum(axis=-1), np.square(shares).sum(axis=-1)
+
+
+class StateRollup:
+    """Mother-tongue group counts of one C-16 workbook for the state and each of its districts.
+
+    District code 0 is the state itself. ``totals`` holds every COUNT_COLUMNS
+    cell (total/rural/urban x persons/males/females) summed over the groups;
+    ``groups`` ranks the groups of each area so shares are a slice.
+    """
+
+    def __init__(self, totals: dict, groups: Ranking):
+        self.totals = totals
+        self.groups = groups
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> "StateRollup":
+        group_rows = df[(df['Town code'] == 0) & (df['Mother tongue code'] % GROUP_CODE_STEP == 0)]
+        agg = group_rows.groupby(['District code', 'Mother tongue name'], observed=True)[COUNT_COLUMNS].sum().reset_index()
+
+        district_totals = agg.groupby('District code')[COUNT_COLUMNS].sum()
+        totals = {
+            int(code): values
+            for code, values in zip(district_totals.index, district_totals.to_numpy(dtype=np.int64))
+        }
+        return cls(totals, Ranking.build(agg, ['District code']))
+
+    def total(self, district_code: int = 0):
+        values = self.totals.get(district_code)
+        if values is None:
+            return None
+        return {metric: int(value) for metric, value in zip(COUNT_COLUMNS, values)}
+
+    def shares(self, district_code: int, metric: str, num_languages: int):
+        values = self.totals.get(district_code)
+        if values is None:
+            return None
+        total = int(values[COUNT_COLUMNS.index(metric)])
+        languages = self.groups.top(district_code, metric, num_languages) or []
+        for language in languages:
+            language["share"] = round(language[metric] / total * 100, 2) if total else 0.0
+        return total, languages
+
+    def diversity(self, district_code: int = 0, metric: str = "Total P"):
+        # Greenberg's index: the chance two people picked at random have different mother tongue groups
+        counts = self.groups.counts(district_code, metric)
+        if counts is None:
+            return None
+        if not counts.any():
+            return 0.0
+        _, _, herfindahl = diversity_indices(counts)
+        return round(float(1 - herfindahl), 4)
+
+
+class RollupCube:
+    """State x district x rural/urban x sex population by mother-tongue group, built per state."""
+
+    def __init__(self, states: dict):
+        # Keyed by workbook stem, like CensusStore.rankings
+        self.states = states
+
+    @classmethod
+    def build(cls, mother_tongue: dict, reuse: dict = None) -> "RollupCube":
+        # reuse: stem -> StateRollup of workbooks unchanged since the last build
+        reuse = reuse or {}
+        return cls({
+            stem: reuse[stem] if stem in reuse else StateRollup.build(df)
+            for stem, df in mother_tongue.items()
+        })
+
+    def state_totals(self) -> pd.DataFrame:
+        rows = [
+            {"State": stem, **rollup.total(0)}
+            for stem, rollup in self.states.items()
+            if 0 in rollup.totals
+        ]
+        return pd.DataFrame(rows, columns=["State"] + COUNT_COLUMNS)
+
+    def national_total(self) -> dict:
+        values = sum((rollup.totals[0] for rollup in self.states.values() if 0 in rollup.totals),
+                     np.zeros(len(COUNT_COLUMNS), dtype=np.int64))
+        return {metric: int(value) for metric, value in zip(COUNT_COLUMNS, values)}
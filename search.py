@@ -0,0 +1,192 @@
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+from census_schema import district_total_rows, name_key, state_name
+from rollups import GROUP_CODE_STEP
+
+KINDS = ["state", "district", "town", "language", "pincode"]
+
+# A word is a fuzzy match when its trigrams overlap the query's by this Dice score
+FUZZY_SIMILARITY = 0.5
+
+
+def _trigrams(word: str) -> set:
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """Prefix and fuzzy name search over states, districts, towns, mother tongues and post offices.
+
+    Every entry is split into words; ``words`` is sorted, so the words
+    starting with a query token are one bisected range, and their postings
+    (entry ids) are stored contiguously in that order. Tokens with no prefix
+    match fall back to the trigram index over the same words. Results are
+    ranked by population: the area's Total P, a language's speakers, or the
+    population of the town a post office is named after.
+    """
+
+    def __init__(self, kinds: np.ndarray, names: list, populations: np.ndarray, details: list,
+                 words: list, word_offsets: np.ndarray, postings: np.ndarray, trigrams: dict,
+                 trigram_words: np.ndarray, word_trigram_counts: np.ndarray):
+        self.kinds = kinds
+        self.names = names
+        self.populations = populations
+        self.details = details
+        self.words = words
+        # Entries containing words[i] are postings[word_offsets[i]:word_offsets[i + 1]]
+        self.word_offsets = word_offsets
+        self.postings = postings
+        # trigram -> (start, end) into trigram_words
+        self.trigrams = trigrams
+        self.trigram_words = trigram_words
+        self.word_trigram_counts = word_trigram_counts
+
+    @classmethod
+    def build(cls, mother_tongue: dict, rollups, pincodes=None, pincode_index=None) -> "SearchIndex":
+        # pincode_index: the store's PincodeIndex, which joins post offices to census towns
+        kinds, names, populations, details = [], [], [], []
+
+        def add(kind, name, population, **detail):
+            kinds.append(KINDS.index(kind))
+            names.append(name)
+            populations.append(int(population))
+            details.append(detail)
+
+        language_speakers = {}
+        town_population = {}
+        for stem, df in mother_tongue.items():
+            state = state_name(stem)
+            rollup = rollups.states.get(stem)
+            totals = rollup.totals if rollup is not None else {}
+            # totals rows are COUNT_COLUMNS, Total P first
+            add("state", state, totals[0][0] if 0 in totals else 0, state=state)
+
+            districts = district_total_rows(df)
+            for district_name, district_code in zip(districts['Area name'], districts['District code']):
+                code = int(district_code)
+                add("district", str(district_name), totals[code][0] if code in totals else 0,
+                    state=state, district_code=code)
+
+            # Towns are sized like the rollups: summed over mother tongue groups
+            town_groups = df[(df['Town code'] != 0) & (df['Mother tongue code'] % GROUP_CODE_STEP == 0)]
+            towns = town_groups.groupby(['District code', 'Town code'], observed=True).agg(
+                name=('Area name', 'first'), population=('Total P', 'sum')
+            )
+            for (district_code, town_code), town_name, population in zip(
+                towns.index, towns['name'], towns['population']
+            ):
+                add("town", str(town_name), population, state=state,
+                    district_code=int(district_code), town_code=int(town_code))
+                town_population[(state, int(district_code), int(town_code))] = int(population)
+
+            state_rows = df[(df['District code'] == 0) & (df['Town code'] == 0)]
+            speakers = state_rows.groupby('Mother tongue name', observed=True)['Total P'].max()
+            for language, count in zip(speakers.index, speakers.to_numpy()):
+                language_speakers[language] = language_speakers.get(language, 0) + int(count)
+
+        for language, count in language_speakers.items():
+            add("language", language, count)
+
+        if pincodes is not None:
+            # Optional columns of the post office directory, renamed like the census details
+            extra = {column: detail for column, detail in (("District", "district"), ("StateName", "state"))
+                     if column in pincodes.columns}
+            for office, pincode, *rest in zip(pincodes['Office Name'], pincodes['Pincode'],
+                                              *(pincodes[column] for column in extra)):
+                if pd.isna(office) or pd.isna(pincode):
+                    continue
+                # Sized by the largest census town the pincode joins to
+                towns = pincode_index.towns(int(pincode)) if pincode_index is not None else []
+                population = max(
+                    (town_population.get((town["state"], town["district_code"], town["town_code"]), 0) for town in towns),
+                    default=0
+                )
+                add("pincode", str(office).strip(), population, pincode=int(pincode),
+                    **{detail: str(value) for detail, value in zip(extra.values(), rest) if not pd.isna(value)})
+
+        # word -> entry ids, flattened in sorted word order
+        word_entries = {}
+        for entry, name in enumerate(names):
+            for word in set(name_key(name).split()):
+                word_entries.setdefault(word, []).append(entry)
+        words = sorted(word_entries)
+        counts = np.fromiter((len(word_entries[word]) for word in words), dtype=np.int64, count=len(words))
+        word_offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        postings = np.fromiter((entry for word in words for entry in word_entries[word]),
+                               dtype=np.int32, count=int(word_offsets[-1]))
+
+        trigram_lists = {}
+        word_trigram_counts = np.empty(len(words), dtype=np.int32)
+        for i, word in enumerate(words):
+            grams = _trigrams(word)
+            word_trigram_counts[i] = len(grams)
+            for gram in grams:
+                trigram_lists.setdefault(gram, []).append(i)
+        trigrams, trigram_words, start = {}, [], 0
+        for gram, ids in trigram_lists.items():
+            trigrams[gram] = (start, start + len(ids))
+            trigram_words.extend(ids)
+            start += len(ids)
+
+        return cls(np.array(kinds, dtype=np.int8), names, np.array(populations, dtype=np.int64), details,
+                   words, word_offsets, postings, trigrams, np.array(trigram_words, dtype=np.int32),
+                   word_trigram_counts)
+
+    def _prefix(self, token: str) -> np.ndarray:
+        lo = bisect_left(self.words, token)
+        hi = bisect_left(self.words, token + "\uffff")
+        return self.postings[self.word_offsets[lo]:self.word_offsets[hi]]
+
+    def _fuzzy(self, token: str) -> np.ndarray:
+        grams = _trigrams(token)
+        spans = [self.trigrams[gram] for gram in grams if gram in self.trigrams]
+        if not spans:
+            return self.postings[:0]
+        shared = np.bincount(np.concatenate([self.trigram_words[start:end] for start, end in spans]),
+                             minlength=len(self.words))
+        dice = 2 * shared / (len(grams) + self.word_trigram_counts)
+        matches = np.flatnonzero(dice >= FUZZY_SIMILARITY)
+        if not len(matches):
+            return self.postings[:0]
+        return np.concatenate([self.postings[self.word_offsets[i]:self.word_offsets[i + 1]] for i in matches])
+
+    def _top(self, entries: np.ndarray, limit: int) -> list:
+        if len(entries) > limit:
+            entries = entries[np.argpartition(-self.populations[entries], limit - 1)[:limit]]
+        # Population descending, then name for a stable order between equals
+        return sorted(entries.tolist(), key=lambda entry: (-self.populations[entry], self.names[entry]))
+
+    def search(self, query: str, limit: int = 10, kinds=None) -> list:
+        tokens = name_key(query).split()
+        if not tokens or limit <= 0:
+            return []
+
+        allowed = None
+        if kinds:
+            allowed = np.isin(self.kinds, [KINDS.index(kind) for kind in kinds])
+
+        def matching(candidates_per_token):
+            # Entries matched by every token, restricted to the requested kinds
+            entries = np.unique(candidates_per_token[0])
+            for candidates in candidates_per_token[1:]:
+                entries = np.intersect1d(entries, candidates)
+            return entries[allowed[entries]] if allowed is not None else entries
+
+        prefix = [self._prefix(token) for token in tokens]
+        exact = matching(prefix)
+        results = [(entry, "prefix") for entry in self._top(exact, limit)]
+
+        if len(results) < limit:
+            # Typos: widen each token with its trigram matches, keep what prefix missed
+            fuzzy = matching([np.concatenate((p, self._fuzzy(token))) for p, token in zip(prefix, tokens)])
+            fuzzy = np.setdiff1d(fuzzy, exact, assume_unique=True)
+            results += [(entry, "fuzzy") for entry in self._top(fuzzy, limit - len(results))]
+
+        return [
+            {"kind": KINDS[self.kinds[entry]], "name": self.names[entry],
+             "population": int(self.populations[entry]), "match": match, **self.details[entry]}
+            for entry, match in results
+        ]